@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Linha de comando do conversor W25 → SSIM - AMS Team
+
+Converte vários arquivos de malha (ou diretórios com .xlsx) em paralelo,
+um processo por arquivo, com progresso por arquivo, resumo final
+(linhas / voos / segundos) e código de saída para pipelines.
+
+Uso:
+    python ams_ssim.py convert malhas/*.xlsx --carriers EK,KL --out-dir saida --jobs 8
+    python ams_ssim.py diff ontem.ssim hoje.ssim
+
+Códigos de saída: 0 = tudo convertido, 1 = algum arquivo falhou,
+2 = uso inválido / nenhum arquivo encontrado.
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import ssim_diff
+from ssim_writer import SSIMWriter
+from version import VERSION
+from w25_to_ssim_converter import iter_ssim_records, nome_arquivo_saida, preparar_schedule
+
+SAIDA_OK = 0
+SAIDA_FALHA = 1
+SAIDA_USO = 2
+
+
+def listar_arquivos(entradas):
+    """Arquivos a converter: caminhos, padrões glob ou diretórios (todos os .xlsx dentro)"""
+    arquivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            arquivos.extend(sorted(glob.glob(os.path.join(entrada, '*.xlsx'))))
+        elif glob.has_magic(entrada):
+            arquivos.extend(sorted(glob.glob(entrada)))
+        else:
+            arquivos.append(entrada)
+    # Sem repetidos e sem arquivos temporários do Excel (~$malha.xlsx)
+    unicos = []
+    for arquivo in arquivos:
+        if arquivo not in unicos and not os.path.basename(arquivo).startswith('~$'):
+            unicos.append(arquivo)
+    return unicos
+
+
+def converter_arquivo(arquivo, carriers=None, out_dir='.', cache_dir=None, workers=None, state_dir=None):
+    """
+    Converte UM arquivo e devolve o resumo (executado em um processo do pool)
+    O SSIM vai para out_dir como <nome da malha>_<CIA|MULTI>_<data>_AMS.ssim
+    """
+    inicio = time.perf_counter()
+    resumo = {'arquivo': arquivo, 'saida': None, 'linhas': 0, 'voos': 0, 'segundos': 0.0, 'erro': None}
+    try:
+        preparado = preparar_schedule(arquivo, cache_dir)
+        companhias = list(carriers) if carriers else preparado.companhias
+        if not companhias:
+            raise ValueError("nenhuma companhia encontrada na malha")
+
+        base = os.path.splitext(os.path.basename(arquivo))[0]
+        saida = os.path.join(out_dir, f"{base}_{nome_arquivo_saida(companhias)}")
+
+        voos = []
+        with SSIMWriter(saida) as writer:
+            writer.write_records(iter_ssim_records(
+                preparado, companhias, workers=workers, state_dir=state_dir, state_namespace=base,
+                on_carrier=lambda companhia, quantidade: voos.append(quantidade)))
+
+        resumo.update(saida=saida, linhas=len(preparado.normalizado), voos=sum(voos))
+    except Exception as e:
+        resumo['erro'] = f"{type(e).__name__}: {e}"
+    resumo['segundos'] = time.perf_counter() - inicio
+    return resumo
+
+
+def _imprimir_progresso(resumo, feitos, total):
+    prefixo = f"[{feitos}/{total}]"
+    if resumo['erro']:
+        print(f"{prefixo} ❌ {resumo['arquivo']}: {resumo['erro']}", flush=True)
+    else:
+        print(f"{prefixo} ✅ {resumo['arquivo']} → {resumo['saida']} "
+              f"({resumo['linhas']} linhas, {resumo['voos']} voos, {resumo['segundos']:.1f}s)", flush=True)
+
+
+def comando_convert(args):
+    arquivos = listar_arquivos(args.arquivos)
+    if not arquivos:
+        print("❌ Nenhum arquivo de malha encontrado", file=sys.stderr)
+        return SAIDA_USO
+
+    carriers = [cia.strip().upper() for cia in args.carriers.split(',') if cia.strip()] if args.carriers else None
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    if not args.quiet:
+        print(f"🔄 Convertendo {len(arquivos)} arquivo(s) com {args.jobs} processo(s)")
+    inicio = time.perf_counter()
+    resumos = []
+    tarefa = dict(carriers=carriers, out_dir=args.out_dir, cache_dir=args.cache_dir, workers=args.workers,
+                  state_dir=args.state_dir)
+
+    if args.jobs <= 1 or len(arquivos) == 1:
+        for arquivo in arquivos:
+            resumos.append(converter_arquivo(arquivo, **tarefa))
+            if not args.quiet:
+                _imprimir_progresso(resumos[-1], len(resumos), len(arquivos))
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futuros = [executor.submit(converter_arquivo, arquivo, **tarefa) for arquivo in arquivos]
+            for futuro in as_completed(futuros):
+                resumos.append(futuro.result())
+                if not args.quiet:
+                    _imprimir_progresso(resumos[-1], len(resumos), len(arquivos))
+
+    falhas = [resumo for resumo in resumos if resumo['erro']]
+    if args.quiet:
+        for resumo in falhas:
+            print(f"❌ {resumo['arquivo']}: {resumo['erro']}", file=sys.stderr)
+        return SAIDA_FALHA if falhas else SAIDA_OK
+
+    print("=" * 80)
+    print(f"📊 Arquivos: {len(resumos) - len(falhas)} ok, {len(falhas)} com erro")
+    print(f"📊 Linhas: {sum(r['linhas'] for r in resumos)} • Voos: {sum(r['voos'] for r in resumos)} • "
+          f"Tempo: {time.perf_counter() - inicio:.1f}s")
+    return SAIDA_FALHA if falhas else SAIDA_OK
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog='ams-ssim', description="Dutch Schedule (W25) to IATA SSIM Converter - AMS Team")
+    parser.add_argument('--version', action='version', version=f"%(prog)s {VERSION}")
+    parser.add_argument('-v', '--verbose', action='store_true', help="mensagens do conversor (logging INFO)")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    convert = subcomandos.add_parser('convert', help="converte arquivos de malha para SSIM")
+    convert.add_argument('arquivos', nargs='+', help="arquivos .xlsx, padrões glob ou diretórios")
+    convert.add_argument('--carriers', help="companhias separadas por vírgula (padrão: todas da malha)")
+    convert.add_argument('--out-dir', default='.', help="diretório dos arquivos SSIM (padrão: atual)")
+    convert.add_argument('--jobs', type=int, default=1, help="arquivos convertidos em paralelo")
+    convert.add_argument('--workers', type=int, default=None, help="processos por arquivo (companhias em paralelo)")
+    convert.add_argument('--cache-dir', default=None, help="cache em disco da malha normalizada")
+    convert.add_argument('--state-dir', default=None,
+                         help="modo incremental: reaproveita os blocos das companhias sem alteração")
+    convert.add_argument('-q', '--quiet', action='store_true',
+                         help="sem progresso nem resumo; só erros (stderr) e código de saída")
+    convert.set_defaults(funcao=comando_convert)
+
+    ssim_diff.configurar_parser(subcomandos.add_parser('diff', help="diferenças entre dois arquivos SSIM"))
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(message)s")
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,14 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-import os
-from w25_to_ssim_converter import gerar_ssim_w25_single_airline, gerar_ssim_w25_todas_companias, gerar_ssim_w25_multiplas_companias, extrair_airline
+import hashlib
+import io
+from datetime import date
+from w25_to_ssim_converter import gerar_ssim_w25_single_airline, gerar_ssim_w25_todas_companias, gerar_ssim_w25_multiplas_companias, preparar_schedule, nome_arquivo_saida
+from pipeline_profiler import ProfilerPipeline
 from version import get_version_info
 
+# Quantas malhas (uploads distintos) ficam em cache no servidor
+CACHE_MAX_SCHEDULES = 4
+
 # Traduções
 TRANSLATIONS = {
     'en': {
@@ -24,6 +28,8 @@ TRANSLATIONS = {
         'processing': 'Processing schedule data...',
         'success': 'File uploaded successfully',
         'preview': 'Schedule Data Preview',
+        'columns_used': 'Columns used',
+        'preview_columns': 'Only the columns used by the converter are loaded',
         'airlines_found': 'Airlines found in file',
         'select_mode': 'Select Conversion Mode',
         'single': 'Single Airline',
@@ -38,6 +44,9 @@ TRANSLATIONS = {
         'validation': 'SSIM Validation',
         'line_length': 'Line length',
         'structure': 'SSIM structure',
+        'profile': 'Performance Report',
+        'profile_upload': 'Schedule load (once per upload)',
+        'profile_conversion': 'Conversion',
         'contact': 'Contact: luis.evaristo@dnata.com.br'
     },
     'nl': {
@@ -57,6 +66,8 @@ TRANSLATIONS = {
         'processing': 'Schema gegevens verwerken...',
         'success': 'Bestand succesvol geüpload',
         'preview': 'Schema Gegevens Voorbeeld',
+        'columns_used': 'Gebruikte kolommen',
+        'preview_columns': 'Alleen de kolommen die de converter gebruikt worden geladen',
         'airlines_found': 'Luchtvaartmaatschappijen gevonden in bestand',
         'select_mode': 'Selecteer Conversie Modus',
         'single': 'Enkele Luchtvaartmaatschappij',
@@ -71,10 +82,42 @@ TRANSLATIONS = {
         'validation': 'SSIM Validatie',
         'line_length': 'Regellengte',
         'structure': 'SSIM structuur',
+        'profile': 'Prestatierapport',
+        'profile_upload': 'Schema inladen (eenmaal per upload)',
+        'profile_conversion': 'Conversie',
         'contact': 'Contact: luis.evaristo@dnata.com.br'
     }
 }
 
+@st.cache_resource(max_entries=CACHE_MAX_SCHEDULES, show_spinner=False)
+def carregar_schedule_cacheado(conteudo_hash, dia, _conteudo):
+    """
+    Lê, normaliza e particiona a malha UMA vez por conteúdo de upload e dia
+    A chave é o hash SHA-256 dos bytes (_conteudo não entra no hash do Streamlit) + o dia
+    (FROM/TILL vazios viram hoje / hoje+365: a malha preparada vale só no dia em que foi feita)
+    Retorna a malha preparada e o relatório de tempos da preparação
+    """
+    profiler = ProfilerPipeline()
+    with profiler.execucao():
+        schedule = preparar_schedule(io.BytesIO(_conteudo), profiler=profiler)
+    return schedule, profiler.relatorio()
+
+def mostrar_relatorio(t, relatorio_preparo, relatorio_conversao):
+    """Tempos por etapa (preparação em cache + conversão) e JSON para download"""
+    with st.expander(f"⏱️ {t['profile']}"):
+        for titulo, relatorio in ((t['profile_upload'], relatorio_preparo),
+                                  (t['profile_conversion'], relatorio_conversao)):
+            st.markdown(f"**{titulo}** • {relatorio.wall_s:.2f}s")
+            st.dataframe(relatorio.to_dataframe(), use_container_width=True, hide_index=True)
+            if relatorio.contadores:
+                st.caption(" • ".join(f"{nome}: {valor}" for nome, valor in relatorio.contadores.items()))
+        st.download_button(
+            label="📥 JSON",
+            data=relatorio_conversao.to_json(),
+            file_name="ssim_profile.json",
+            mime="application/json"
+        )
+
 def main():
     st.set_page_config(
         page_title="AMS SSIM Converter - Dnata Brasil", 
@@ -170,7 +213,7 @@ def main():
             ✨ Dutch Schedule to SSIM conversion
             🇳🇱 Dutch orange theme + bilingual (EN/NL)
             🔗 Turnarounds and night stops with Next Flight
-            ⏰ AMS timezone (+0100) support
+            ⏰ Station UTC offsets (DST-aware)
             📊 Multiple Airlines (Custom Selection) mode
             """)
     
@@ -186,25 +229,20 @@ def main():
     
     if uploaded_file:
         try:
+            # Reexecuções do script (troca de modo/companhia) reaproveitam a malha em cache
+            conteudo = uploaded_file.getvalue()
             with st.spinner(t['processing']):
-                df = pd.read_excel(uploaded_file)
+                schedule, relatorio_preparo = carregar_schedule_cacheado(
+                    hashlib.sha256(conteudo).hexdigest(), date.today().isoformat(), conteudo)
+            df = schedule.df
             
             st.success(f"✅ {t['success']} • {len(df)} rows")
             
             # Preview dos dados
             st.markdown(f"### 📊 {t['preview']}")
             
-            # Encontrar companhias aéreas
-            airlines = set()
-            for col in ['A.FLT', 'D.FLT']:
-                if col in df.columns:
-                    for flight in df[col].dropna():
-                        if flight != 'N/S':
-                            airline = extrair_airline(flight)
-                            if airline:
-                                airlines.add(airline)
-            
-            airlines = sorted(list(airlines))
+            # Companhias aéreas (já particionadas no cache)
+            airlines = schedule.companhias
             
             # Métricas
             col1, col2, col3 = st.columns(3)
@@ -213,10 +251,11 @@ def main():
             with col2:
                 st.metric("Total Rows", len(df))
             with col3:
-                st.metric("Columns", len(df.columns))
+                st.metric(t['columns_used'], len(df.columns))
             
-            # Mostrar primeiras linhas
+            # Mostrar primeiras linhas (colunas projetadas pelo schedule_loader, não a planilha inteira)
             st.dataframe(df.head(10), use_container_width=True)
+            st.caption(t['preview_columns'])
             
             st.markdown("---")
             
@@ -258,25 +297,36 @@ def main():
                     st.error("Please select at least one airline")
                 else:
                     with st.spinner(t['converting']):
-                        # Salvar arquivo temporário
-                        temp_file = f"temp_schedule_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                        df.to_excel(temp_file, index=False)
+                        # Malha já normalizada (cache) vai direto ao conversor e a saída fica em memória
+                        # (sem Excel temporário nem arquivo SSIM temporário)
+                        if conversion_mode == 'single':
+                            file_name = nome_arquivo_saida([selected_airline])
+                        elif conversion_mode == 'multiple':
+                            file_name = nome_arquivo_saida(selected_airlines)
+                        else:
+                            file_name = nome_arquivo_saida(airlines)
+                        output_buffer = io.BytesIO()
+                        profiler = ProfilerPipeline()
+                        barra = st.progress(0.0, text=t['converting'])
+                        
+                        def progresso(etapa, feitos, total):
+                            fracao = min(feitos / total, 1.0) if total else 1.0
+                            barra.progress(fracao, text=f"{t['converting']} {etapa}: {feitos:,}/{total:,}")
                         
                         try:
                             if conversion_mode == 'single':
-                                output_file = gerar_ssim_w25_single_airline(temp_file, selected_airline)
+                                output_file = gerar_ssim_w25_single_airline(schedule, selected_airline, output_buffer,
+                                                                            profiler=profiler, progress_callback=progresso)
                             elif conversion_mode == 'multiple':
-                                output_file = gerar_ssim_w25_multiplas_companias(temp_file, selected_airlines)
+                                output_file = gerar_ssim_w25_multiplas_companias(schedule, selected_airlines, output_buffer,
+                                                                                 profiler=profiler, progress_callback=progresso)
                             else:
-                                output_file = gerar_ssim_w25_todas_companias(temp_file)
-                            
-                            # Limpar temp
-                            if os.path.exists(temp_file):
-                                os.remove(temp_file)
+                                output_file = gerar_ssim_w25_todas_companias(schedule, output_buffer, profiler=profiler,
+                                                                             progress_callback=progresso)
+                            barra.empty()
                             
-                            if output_file and os.path.exists(output_file):
-                                with open(output_file, 'r', encoding='utf-8') as f:
-                                    ssim_content = f.read()
+                            if output_file is not None:
+                                ssim_content = output_buffer.getvalue().decode('utf-8')
                                 
                                 st.success("✅ SSIM file generated successfully!")
                                 
@@ -284,7 +334,7 @@ def main():
                                 st.download_button(
                                     label=f"📥 {t['download']}",
                                     data=ssim_content,
-                                    file_name=output_file,
+                                    file_name=file_name,
                                     mime="text/plain",
                                     type="primary",
                                     use_container_width=True
@@ -313,15 +363,12 @@ def main():
                                     status = "✅ Complete" if structure_ok else "❌ Incomplete"
                                     st.metric(t['structure'], status)
                                 
-                                # Limpar output
-                                os.remove(output_file)
+                                mostrar_relatorio(t, relatorio_preparo, profiler.relatorio())
                             else:
                                 st.error("❌ Error generating SSIM file")
                         
                         except Exception as e:
                             st.error(f"❌ Error: {str(e)}")
-                            if os.path.exists(temp_file):
-                                os.remove(temp_file)
         
         except Exception as e:
             st.error(f"❌ Error reading file: {str(e)}")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do conversor W25 → SSIM - AMS Team
+
+Mede cada etapa do caminho quente com malhas sintéticas
+(synthetic_schedule) de 1k, 100k e 1M linhas:
+
+    load       leitura do Excel (carregar_schedule) - só até 100k linhas
+    normalize  normalizar_schedule
+    partition  particionar_por_companhia (filtro por companhia)
+    build      gerar_registros_companhia para todas as companhias
+    write      SSIMWriter em memória
+
+Não roda com a suíte normal (arquivo bench_*, fora da coleta padrão):
+
+    python -m pytest bench_converter.py --benchmark-only
+    AMS_BENCH_LINHAS=1000,100000 python -m pytest bench_converter.py --benchmark-only
+
+Requer pytest-benchmark.
+"""
+
+import io
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from schedule_loader import carregar_schedule
+from ssim_writer import SSIMWriter
+from synthetic_schedule import gerar_malha_sintetica, salvar_malha_sintetica
+from w25_to_ssim_converter import gerar_registros_companhia, normalizar_schedule, particionar_por_companhia
+
+TAMANHOS = [int(valor) for valor in os.environ.get("AMS_BENCH_LINHAS", "1000,100000,1000000").split(",")]
+
+# Planilhas grandes demoram minutos só para serem gravadas: load só até este tamanho
+LIMITE_EXCEL = 100_000
+
+# Rodadas por tamanho (malhas grandes: poucas rodadas, cada uma já leva segundos)
+RODADAS = {1000: 20, 100_000: 3}
+
+
+def _rodadas(linhas):
+    return RODADAS.get(linhas, 1)
+
+
+@pytest.fixture(scope="module", params=TAMANHOS, ids=lambda linhas: f"{linhas}_linhas")
+def malha(request):
+    """Malha sintética + normalizada + partição + registros, gerados uma vez por tamanho"""
+    df = gerar_malha_sintetica(request.param, seed=request.param)
+    df_norm = normalizar_schedule(df)
+    particao = particionar_por_companhia(df_norm)
+    return {"linhas": request.param, "df": df, "normalizado": df_norm, "particao": particao}
+
+
+def _gerar_todas(df_norm, particao):
+    flight_counter, numero_linha, registros = {}, 1, []
+    for companhia in sorted(particao):
+        linhas = gerar_registros_companhia(df_norm, companhia, flight_counter, numero_linha, particao)
+        numero_linha += len(linhas)
+        registros.extend(linhas)
+    return registros
+
+
+def test_load(benchmark, malha, tmp_path_factory):
+    if malha["linhas"] > LIMITE_EXCEL:
+        pytest.skip(f"planilha com mais de {LIMITE_EXCEL} linhas")
+    caminho = tmp_path_factory.mktemp("malha") / "w25.xlsx"
+    salvar_malha_sintetica(caminho, malha["linhas"], seed=malha["linhas"])
+    df = benchmark.pedantic(carregar_schedule, args=(caminho,), rounds=_rodadas(malha["linhas"]))
+    assert len(df) == malha["linhas"]
+
+
+def test_normalize(benchmark, malha):
+    df_norm = benchmark.pedantic(normalizar_schedule, args=(malha["df"],), rounds=_rodadas(malha["linhas"]))
+    assert len(df_norm) == malha["linhas"]
+
+
+def test_partition(benchmark, malha):
+    particao = benchmark.pedantic(particionar_por_companhia, args=(malha["normalizado"],),
+                                  rounds=_rodadas(malha["linhas"]))
+    assert sum(len(posicoes) for posicoes in particao.values()) >= malha["linhas"] * 0.9
+
+
+def test_build(benchmark, malha):
+    registros = benchmark.pedantic(_gerar_todas, args=(malha["normalizado"], malha["particao"]),
+                                   rounds=_rodadas(malha["linhas"]))
+    assert registros and all(len(registro) == 200 for registro in registros[:100])
+
+
+def test_write(benchmark, malha):
+    registros = _gerar_todas(malha["normalizado"], malha["particao"])
+
+    def escrever():
+        destino = io.BytesIO()
+        with SSIMWriter(destino) as writer:
+            writer.write_records(registros)
+        return destino
+
+    destino = benchmark.pedantic(escrever, rounds=_rodadas(malha["linhas"]))
+    assert len(destino.getvalue()) == len(registros) * 201
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Medição por etapa do pipeline de conversão - AMS Team
+
+ProfilerPipeline registra, para cada etapa nomeada (load, normalize,
+partition, build, write...), tempo de relógio, tempo de CPU, número de
+chamadas e pico de memória (tracemalloc, opcional), além de contadores
+(linhas, voos, registros). Etapas aninhadas descontam o tempo das
+internas (tempo próprio), então a soma das etapas não conta nada duas
+vezes. Opcionalmente captura um cProfile da execução inteira.
+
+Uso:
+    profiler = ProfilerPipeline(memoria=True)
+    gerar_ssim_completo("malha.xlsx", output_file="saida.ssim", profiler=profiler)
+    relatorio = profiler.relatorio()
+    print(relatorio)
+    relatorio.to_json("perfil.json")
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+
+class EtapaMedida(NamedTuple):
+    """Resultado de uma etapa: totais acumulados de todas as chamadas"""
+    nome: str
+    chamadas: int
+    wall_s: float
+    cpu_s: float
+    pico_memoria: Optional[int]     # bytes (None sem tracemalloc)
+
+
+class RelatorioPipeline:
+    """Relatório estruturado de uma execução (etapas, contadores, totais, cProfile)"""
+
+    def __init__(self, etapas, contadores, wall_s, cpu_s, pico_memoria=None, cprofile=None):
+        self.etapas = etapas
+        self.contadores = contadores
+        self.wall_s = wall_s
+        self.cpu_s = cpu_s
+        self.pico_memoria = pico_memoria
+        self.cprofile = cprofile
+
+    def to_dict(self):
+        return {
+            'total_wall_s': round(self.wall_s, 6),
+            'total_cpu_s': round(self.cpu_s, 6),
+            'peak_memory_bytes': self.pico_memoria,
+            'stages': [{
+                'name': etapa.nome,
+                'calls': etapa.chamadas,
+                'wall_s': round(etapa.wall_s, 6),
+                'cpu_s': round(etapa.cpu_s, 6),
+                'peak_memory_bytes': etapa.pico_memoria,
+            } for etapa in self.etapas],
+            'counters': dict(self.contadores),
+            'cprofile': self.cprofile,
+        }
+
+    def to_json(self, caminho=None, indent=2):
+        """Relatório em JSON (e grava em `caminho`, se informado)"""
+        texto = json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+        if caminho is not None:
+            with open(caminho, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(texto)
+        return texto
+
+    def to_dataframe(self):
+        """Uma linha por etapa, com a fração do tempo total"""
+        df = pd.DataFrame([etapa._asdict() for etapa in self.etapas],
+                          columns=['nome', 'chamadas', 'wall_s', 'cpu_s', 'pico_memoria'])
+        df['pct_wall'] = (100 * df['wall_s'] / self.wall_s).round(1) if self.wall_s else 0.0
+        return df
+
+    def __str__(self):
+        linhas = [f"{'etapa':<12} {'chamadas':>8} {'wall (s)':>10} {'cpu (s)':>10} {'pico mem (MB)':>14}"]
+        for etapa in self.etapas:
+            memoria = f"{etapa.pico_memoria / 2**20:.1f}" if etapa.pico_memoria is not None else '-'
+            linhas.append(f"{etapa.nome:<12} {etapa.chamadas:>8} {etapa.wall_s:>10.3f} "
+                          f"{etapa.cpu_s:>10.3f} {memoria:>14}")
+        linhas.append(f"{'total':<12} {'':>8} {self.wall_s:>10.3f} {self.cpu_s:>10.3f}")
+        if self.contadores:
+            linhas.append(" • ".join(f"{nome}: {valor}" for nome, valor in self.contadores.items()))
+        return "\n".join(linhas)
+
+
+class _Medicao:
+    __slots__ = ('chamadas', 'wall', 'cpu', 'pico', 'inicio_wall', 'inicio_cpu')
+
+    def __init__(self):
+        self.chamadas = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.pico = None
+        self.inicio_wall = 0.0
+        self.inicio_cpu = 0.0
+
+    def pausar(self, wall, cpu):
+        self.wall += wall - self.inicio_wall
+        self.cpu += cpu - self.inicio_cpu
+
+    def retomar(self, wall, cpu):
+        self.inicio_wall, self.inicio_cpu = wall, cpu
+
+
+class ProfilerPipeline:
+    """
+    Coletor das medições de uma conversão
+
+    memoria=True liga o tracemalloc durante a execução (pico por etapa);
+    cprofile=True captura um cProfile e guarda as `linhas_cprofile`
+    funções mais caras (tempo acumulado) no relatório.
+    """
+
+    def __init__(self, memoria=False, cprofile=False, linhas_cprofile=30):
+        self.memoria = memoria
+        self.cprofile = cprofile
+        self.linhas_cprofile = linhas_cprofile
+        self._medicoes = {}
+        self._pilha = []
+        self.contadores = {}
+        self._wall = 0.0
+        self._cpu = 0.0
+        self._pico = None
+        self._cprofile_texto = None
+
+    def _registrar_pico(self):
+        """Repassa o pico atual do tracemalloc às etapas ativas e ao total"""
+        if not (self.memoria and tracemalloc.is_tracing()):
+            return
+        pico = tracemalloc.get_traced_memory()[1]
+        for medicao in self._pilha:
+            medicao.pico = max(medicao.pico or 0, pico)
+        self._pico = max(self._pico or 0, pico)
+        tracemalloc.reset_peak()
+
+    @contextlib.contextmanager
+    def execucao(self):
+        """Envolve a conversão inteira: tempo total, tracemalloc e cProfile"""
+        iniciou_tracemalloc = self.memoria and not tracemalloc.is_tracing()
+        if iniciou_tracemalloc:
+            tracemalloc.start()
+        perfil = cProfile.Profile() if self.cprofile else None
+        inicio_wall, inicio_cpu = time.perf_counter(), time.process_time()
+        if perfil is not None:
+            perfil.enable()
+        try:
+            yield self
+        finally:
+            if perfil is not None:
+                perfil.disable()
+            self._wall += time.perf_counter() - inicio_wall
+            self._cpu += time.process_time() - inicio_cpu
+            self._registrar_pico()
+            if iniciou_tracemalloc:
+                tracemalloc.stop()
+            if perfil is not None:
+                saida = io.StringIO()
+                pstats.Stats(perfil, stream=saida).sort_stats('cumulative').print_stats(self.linhas_cprofile)
+                self._cprofile_texto = saida.getvalue()
+
+    @contextlib.contextmanager
+    def etapa(self, nome):
+        """Mede uma etapa; várias entradas com o mesmo nome são acumuladas"""
+        medicao = self._medicoes.setdefault(nome, _Medicao())
+        self._registrar_pico()
+        agora_wall, agora_cpu = time.perf_counter(), time.process_time()
+        if self._pilha:
+            self._pilha[-1].pausar(agora_wall, agora_cpu)
+        medicao.retomar(agora_wall, agora_cpu)
+        self._pilha.append(medicao)
+        try:
+            yield medicao
+        finally:
+            self._registrar_pico()
+            agora_wall, agora_cpu = time.perf_counter(), time.process_time()
+            self._pilha.pop().pausar(agora_wall, agora_cpu)
+            medicao.chamadas += 1
+            if self._pilha:
+                self._pilha[-1].retomar(agora_wall, agora_cpu)
+
+    def contar(self, nome, quantidade=1):
+        """Soma `quantidade` ao contador `nome` (linhas, voos, registros...)"""
+        self.contadores[nome] = self.contadores.get(nome, 0) + quantidade
+
+    def relatorio(self):
+        etapas = [EtapaMedida(nome, medicao.chamadas, medicao.wall, medicao.cpu, medicao.pico)
+                  for nome, medicao in self._medicoes.items()]
+        return RelatorioPipeline(etapas, dict(self.contadores), self._wall, self._cpu,
+                                 self._pico, self._cprofile_texto)
+
+
+def medir(profiler, nome):
+    """profiler.etapa(nome) ou um contexto vazio quando não há profiler"""
+    return profiler.etapa(nome) if profiler is not None else contextlib.nullcontext()
+
+
+def medir_execucao(profiler):
+    """profiler.execucao() ou um contexto vazio quando não há profiler"""
+    return profiler.execucao() if profiler is not None else contextlib.nullcontext()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Cache em disco da malha normalizada - AMS Team
+
+Guarda o resultado de normalizar_schedule (companhias, números de voo,
+horários HHMM, dias operacionais, períodos) em Parquet, com a chave
+formada pelo hash do arquivo de origem + versão do conversor. Em
+conversões seguintes do mesmo arquivo o Excel nem é aberto.
+
+Sem pyarrow/fastparquet instalados o cache usa pickle do pandas.
+Datas vazias na malha são preenchidas com a data do dia, por isso a
+chave também inclui o dia: entradas de dias anteriores são removidas.
+"""
+
+import contextlib
+import glob
+import hashlib
+import importlib.util
+import os
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+from version import VERSION
+
+# Muda quando o conjunto/formato das colunas normalizadas mudar
+FORMATO_CACHE = 5
+
+# Blocos de leitura para o hash do arquivo de origem
+_BLOCO_HASH = 1024 * 1024
+
+
+def _extensao():
+    if importlib.util.find_spec('pyarrow') or importlib.util.find_spec('fastparquet'):
+        return 'parquet'
+    return 'pkl'
+
+
+def hash_arquivo(caminho):
+    """SHA-256 do conteúdo do arquivo (lido em blocos)"""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(_BLOCO_HASH), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def chave_cache(caminho):
+    """Chave da entrada: hash do arquivo + versão do conversor + formato + dia"""
+    return f"{hash_arquivo(caminho)}-v{VERSION}-f{FORMATO_CACHE}-{datetime.now():%Y%m%d}"
+
+
+def _caminho_entrada(cache_dir, chave):
+    return os.path.join(cache_dir, f"{chave}.{_extensao()}")
+
+
+def ler_cache(cache_dir, chave):
+    """Malha normalizada em cache ou None (ausente / ilegível)"""
+    caminho = _caminho_entrada(cache_dir, chave)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        if caminho.endswith('.parquet'):
+            df_norm = pd.read_parquet(caminho)
+        else:
+            df_norm = pd.read_pickle(caminho)
+    except Exception:
+        return None
+
+    # Colunas de texto voltam como object com None nos vazios (igual à normalização)
+    texto = [coluna for coluna in df_norm.columns
+             if not (pd.api.types.is_bool_dtype(df_norm[coluna]) or pd.api.types.is_numeric_dtype(df_norm[coluna])
+                     or pd.api.types.is_datetime64_any_dtype(df_norm[coluna]))]
+    df_norm[texto] = df_norm[texto].astype(object).where(df_norm[texto].notna(), None)
+    return df_norm
+
+
+def gravar_cache(cache_dir, chave, df_norm):
+    """
+    Grava a malha normalizada e remove entradas antigas do mesmo arquivo
+    Cada gravação usa um temporário próprio: conversões simultâneas do mesmo
+    arquivo não se atrapalham (a última a terminar fica com a entrada)
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    caminho = _caminho_entrada(cache_dir, chave)
+    descritor, temporario = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    os.close(descritor)
+    try:
+        if caminho.endswith('.parquet'):
+            df_norm.to_parquet(temporario, index=False)
+        else:
+            df_norm.to_pickle(temporario)
+        os.replace(temporario, caminho)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporario)
+        raise
+
+    # Só entradas prontas (nunca o .tmp de outra gravação em andamento)
+    prefixo = chave.split('-', 1)[0]
+    for extensao in ('parquet', 'pkl'):
+        for antigo in glob.glob(os.path.join(cache_dir, f"{prefixo}-*.{extensao}")):
+            if antigo != caminho:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(antigo)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Leitura rápida da malha W25 (Excel) - AMS Team
+
+Lê apenas as colunas usadas pelo conversor (usecols), com tipos texto
+declarados para designadores, estações, aeronave, FLT.TYPE e dias
+operacionais (sem inferência coluna a coluna). Usa o engine calamine
+quando python-calamine está instalado e volta automaticamente para o
+openpyxl (modo read_only do pandas) se não estiver ou se falhar.
+"""
+
+import importlib.util
+
+import pandas as pd
+
+# Colunas de dias operacionais na ordem 1 (segunda) → 7 (domingo)
+COLUNAS_DIAS = [f"OP.D.{i}" if i < 7 else "OP/D/7" for i in range(1, 8)]
+
+# Colunas lidas como texto (sem inferência de tipo)
+COLUNAS_TEXTO = ['A.FLT', 'D.FLT', 'ORIG', 'DEST', 'ATY', 'FLT.TYPE'] + COLUNAS_DIAS
+
+# Horários (time / texto) e datas (datetime / texto) ficam com o tipo lido da célula
+COLUNAS_SCHEDULE = COLUNAS_TEXTO + ['STA', 'STD', 'FROM', 'TILL']
+
+
+def calamine_disponivel():
+    """True se o engine calamine (python-calamine) pode ser usado"""
+    return importlib.util.find_spec('python_calamine') is not None
+
+
+def _ler(fonte, engine):
+    return pd.read_excel(
+        fonte,
+        engine=engine,
+        usecols=lambda coluna: coluna in COLUNAS_SCHEDULE,
+        dtype={coluna: str for coluna in COLUNAS_TEXTO},
+    )
+
+
+def carregar_schedule(fonte, engine=None):
+    """
+    Lê a malha (caminho ou objeto arquivo) projetando só as colunas do conversor
+    engine=None → calamine se instalado, senão o padrão do pandas (openpyxl)
+    """
+    if engine is None and calamine_disponivel():
+        posicao = fonte.tell() if hasattr(fonte, 'seek') else None
+        try:
+            return _ler(fonte, 'calamine')
+        except Exception:
+            # pandas antigo sem suporte a calamine ou arquivo que o calamine não lê
+            # (python_calamine.CalamineError não deriva de ValueError)
+            if posicao is not None:
+                fonte.seek(posicao)
+    return _ler(fonte, engine)
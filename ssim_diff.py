@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Diferenças entre dois arquivos SSIM - AMS Team
+
+Compara duas conversões (ex.: ontem × hoje) pelos registros tipo 3.
+Cada voo é identificado por (companhia, voo, itinerary variation, leg
+sequence, período). Os voos do arquivo antigo ficam num dicionário;
+o arquivo novo é lido em fluxo contra ele (hash join). O resultado traz
+os voos incluídos, removidos e alterados, com as mudanças campo a campo.
+Posições e nomes dos campos vêm de ssim_layout; os arquivos são lidos
+por mmap via SSIMReader.
+
+Uso:
+    python ssim_diff.py ontem.ssim hoje.ssim [--limit 50] [--csv mudancas.csv]
+
+Código de saída como o diff: 0 = iguais, 1 = há diferenças.
+"""
+
+import argparse
+import sys
+from typing import NamedTuple
+
+import pandas as pd
+
+from ssim_layout import LEITOR_TIPO_3, campo
+from ssim_reader import SSIMReader
+
+# Campos que identificam um voo nos dois arquivos
+CAMPOS_CHAVE = ('airline', 'flight_number', 'itinerary_variation', 'leg_sequence', 'period_from', 'period_to')
+
+# Campos ignorados na comparação (mudam com a posição do registro)
+CAMPOS_IGNORADOS = ('record_serial',)
+
+_FATIAS_CHAVE = tuple(slice(campo(3, nome).inicio, campo(3, nome).fim) for nome in CAMPOS_CHAVE)
+_FIM_CONTEUDO = campo(3, 'record_serial').inicio
+
+
+class AlteracaoVoo(NamedTuple):
+    """Voo presente nos dois arquivos com campos diferentes: campo → (antes, depois)"""
+    chave: tuple
+    campos: dict
+
+
+class ResultadoDiff(NamedTuple):
+    adicionados: list      # chaves presentes só no arquivo novo
+    removidos: list        # chaves presentes só no arquivo antigo
+    alterados: list        # AlteracaoVoo
+    inalterados: int
+
+    @property
+    def tem_diferencas(self):
+        return bool(self.adicionados or self.removidos or self.alterados)
+
+    def to_dataframe(self):
+        """Uma linha por mudança: tipo (added/removed/modified), chave, campo, antes, depois"""
+        linhas = [('added', *chave, None, None, None) for chave in self.adicionados]
+        linhas += [('removed', *chave, None, None, None) for chave in self.removidos]
+        for alteracao in self.alterados:
+            linhas += [('modified', *alteracao.chave, nome, antes, depois)
+                       for nome, (antes, depois) in alteracao.campos.items()]
+        return pd.DataFrame(linhas, columns=['change', *CAMPOS_CHAVE, 'field', 'before', 'after'])
+
+
+def _chave(bruto):
+    return tuple(bruto[fatia] for fatia in _FATIAS_CHAVE)
+
+
+def _texto_chave(chave):
+    return tuple(parte.decode('latin-1').strip() for parte in chave)
+
+
+def _campos_alterados(antes, depois):
+    campos_antes, campos_depois = LEITOR_TIPO_3.ler(antes), LEITOR_TIPO_3.ler(depois)
+    return {nome: (campos_antes[nome], campos_depois[nome])
+            for nome in LEITOR_TIPO_3.nomes
+            if nome not in CAMPOS_IGNORADOS and campos_antes[nome] != campos_depois[nome]}
+
+
+def indexar_voos(reader):
+    """Dicionário chave → registros tipo 3 (bytes), na ordem do arquivo"""
+    indice = {}
+    for registro in reader.iter_tipo(3):
+        bruto = registro.bruto
+        indice.setdefault(_chave(bruto), []).append(bruto)
+    return indice
+
+
+def diff_ssim(arquivo_antigo, arquivo_novo):
+    """
+    Compara os voos (registros tipo 3) de dois arquivos SSIM
+    Chaves repetidas são casadas na ordem em que aparecem em cada arquivo
+    """
+    with SSIMReader(arquivo_antigo) as antigo:
+        indice = indexar_voos(antigo)
+
+    adicionados, alterados, inalterados = [], [], 0
+    with SSIMReader(arquivo_novo) as novo:
+        for registro in novo.iter_tipo(3):
+            bruto = registro.bruto
+            chave = _chave(bruto)
+            candidatos = indice.get(chave)
+            if not candidatos:
+                adicionados.append(_texto_chave(chave))
+                continue
+            anterior = candidatos.pop(0)
+            if not candidatos:
+                del indice[chave]
+            # Serial fora da comparação: muda sempre que algo antes dele entra ou sai
+            if bruto[:_FIM_CONTEUDO] == anterior[:_FIM_CONTEUDO]:
+                inalterados += 1
+            else:
+                alterados.append(AlteracaoVoo(_texto_chave(chave), _campos_alterados(anterior, bruto)))
+
+    removidos = [_texto_chave(chave) for chave, restantes in indice.items() for _ in restantes]
+    return ResultadoDiff(adicionados, removidos, alterados, inalterados)
+
+
+def _formatar_chave(chave):
+    airline, voo, itin_var, leg_seq, inicio, fim = chave
+    return f"{airline} {voo} {itin_var}/{leg_seq} {inicio}-{fim}"
+
+
+def imprimir_resultado(resultado, limite=50):
+    """Resumo + até `limite` voos de cada tipo de mudança"""
+    print(f"➕ Incluídos: {len(resultado.adicionados)}")
+    print(f"➖ Removidos: {len(resultado.removidos)}")
+    print(f"✏️ Alterados: {len(resultado.alterados)}")
+    print(f"✅ Sem alteração: {resultado.inalterados}")
+
+    for titulo, chaves in (("INCLUÍDOS", resultado.adicionados), ("REMOVIDOS", resultado.removidos)):
+        if chaves:
+            print(f"\n{titulo}:")
+            for chave in chaves[:limite]:
+                print(f"  {_formatar_chave(chave)}")
+    if resultado.alterados:
+        print("\nALTERADOS:")
+        for alteracao in resultado.alterados[:limite]:
+            mudancas = ", ".join(f"{nome}: '{antes}' → '{depois}'" for nome, (antes, depois) in alteracao.campos.items())
+            print(f"  {_formatar_chave(alteracao.chave)}: {mudancas}")
+
+
+def comando_diff(args):
+    resultado = diff_ssim(args.antigo, args.novo)
+    imprimir_resultado(resultado, args.limit)
+    if args.csv:
+        resultado.to_dataframe().to_csv(args.csv, index=False)
+        print(f"\n📄 Mudanças em: {args.csv}")
+    return 1 if resultado.tem_diferencas else 0
+
+
+def configurar_parser(parser):
+    parser.add_argument('antigo', help="arquivo SSIM de referência (ex.: conversão anterior)")
+    parser.add_argument('novo', help="arquivo SSIM novo")
+    parser.add_argument('--limit', type=int, default=50, help="voos listados por tipo de mudança")
+    parser.add_argument('--csv', help="grava todas as mudanças em CSV")
+    parser.set_defaults(funcao=comando_diff)
+    return parser
+
+
+def main(argv=None):
+    parser = configurar_parser(argparse.ArgumentParser(
+        prog='ssim-diff', description="Diferenças entre dois arquivos SSIM (voos tipo 3)"))
+    args = parser.parse_args(argv)
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Estado da reconversão incremental - AMS Team
+
+Guarda, por companhia, o bloco de registros tipo 3 da última conversão.
+O nome do arquivo vem da impressão digital (hash) das linhas normalizadas
+da companhia. Na conversão seguinte, companhias com a mesma impressão
+reaproveitam o bloco gravado e só as alteradas são geradas de novo; o
+conversor refaz os seriais ao juntar os blocos.
+
+O estado de cada malha de origem fica em um subdiretório próprio (nome do
+arquivo sem extensão): malhas diferentes no mesmo state_dir não apagam os
+blocos umas das outras.
+"""
+
+import contextlib
+import glob
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+from version import VERSION
+
+# Muda quando o formato dos blocos gravados mudar
+FORMATO_ESTADO = 3
+
+
+def impressao_digital(df_companhia, companhia):
+    """Hash das linhas normalizadas de uma companhia (ordem das linhas incluída)"""
+    sha = hashlib.sha256(f"{companhia}|{VERSION}|{FORMATO_ESTADO}|".encode())
+    sha.update(",".join(df_companhia.columns).encode())
+    sha.update(pd.util.hash_pandas_object(df_companhia, index=False).to_numpy().tobytes())
+    return sha.hexdigest()
+
+
+def nome_origem(origem):
+    """Nome da malha de origem sem extensão (caminho ou objeto arquivo com .name) ou None"""
+    nome = getattr(origem, 'name', origem)
+    if isinstance(nome, (str, os.PathLike)):
+        return os.path.splitext(os.path.basename(os.fspath(nome)))[0] or None
+    return None
+
+
+class EstadoIncremental:
+    """
+    Blocos tipo 3 por companhia em state_dir, endereçados pela impressão digital
+    namespace: subdiretório do estado (ex.: nome_origem da malha); None → o próprio state_dir
+
+    Um bloco só é encontrado se a impressão for exatamente a mesma; gravar um
+    bloco novo remove os anteriores da companhia. Uma conversão interrompida
+    nunca deixa um bloco associado à impressão errada.
+    """
+
+    def __init__(self, state_dir, namespace=None):
+        self.state_dir = os.fspath(state_dir)
+        if namespace:
+            self.state_dir = os.path.join(self.state_dir, namespace)
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.reaproveitadas = []
+        self.regeneradas = []
+
+    def _caminho(self, companhia, impressao):
+        return os.path.join(self.state_dir, f"{companhia}-{impressao}.ssim3")
+
+    def bloco(self, companhia, impressao):
+        """Linhas tipo 3 gravadas para esta impressão ou None"""
+        caminho = self._caminho(companhia, impressao)
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                linhas = arquivo.read().splitlines()
+        except FileNotFoundError:
+            return None
+        self.reaproveitadas.append(companhia)
+        return linhas
+
+    def guardar(self, companhia, impressao, linhas):
+        """Grava o bloco da companhia (substitui os de impressões anteriores)"""
+        caminho = self._caminho(companhia, impressao)
+        # Temporário próprio: conversões simultâneas da mesma malha não se atrapalham
+        descritor, temporario = tempfile.mkstemp(dir=self.state_dir, suffix='.tmp')
+        try:
+            with open(descritor, 'w', encoding='utf-8') as arquivo:
+                arquivo.write("".join(f"{linha}\n" for linha in linhas))
+            os.replace(temporario, caminho)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temporario)
+            raise
+
+        for antigo in glob.glob(os.path.join(self.state_dir, f"{companhia}-*.ssim3")):
+            if antigo != caminho:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(antigo)
+        self.regeneradas.append(companhia)
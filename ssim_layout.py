@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Layout de largura fixa dos registros SSIM - AMS Team
+
+Registro ÚNICO de layouts (tipos 1, 2, 3, 4 e 5): cada tabela de campos
+(nome, início, tamanho, alinhamento, preenchimento) é compilada
+
+- em um formatador para o writer: template de 200 posições com os campos
+  fixos já gravados e uma especificação de formato com largura E precisão
+  (padding + corte) para cada campo variável;
+- em um leitor para o parser: struct.Struct que fatia os campos variáveis
+  de uma vez só e pula os fixos.
+
+A largura dos campos é validada UMA vez, quando a tabela é compilada,
+e não a cada linha.
+"""
+
+import struct
+from typing import NamedTuple, Optional
+
+# Tamanho fixo de todos os registros SSIM
+TAMANHO_REGISTRO = 200
+
+
+class Campo(NamedTuple):
+    """Campo de um registro: posição 0-based, tamanho, alinhamento e preenchimento"""
+    nome: str
+    inicio: int
+    tamanho: int
+    alinhamento: str = '<'          # '<' = esquerda, '>' = direita
+    preenchimento: str = ' '
+    fixo: Optional[str] = None      # valor constante já gravado no template
+
+    @property
+    def fim(self):
+        return self.inicio + self.tamanho
+
+
+# Registro tipo 1 (Header)
+LAYOUT_TIPO_1 = (
+    Campo('record_type', 0, 1, fixo='1'),
+    Campo('title', 1, 34, fixo='AIRLINE STANDARD SCHEDULE DATA SET'),
+    Campo('spare', 35, 157, fixo=' '),
+    Campo('record_serial', 192, 8, '>', '0'),
+)
+
+# Registro tipo 2 (Carrier) - único para todas as companhias
+LAYOUT_TIPO_2 = (
+    Campo('record_type', 0, 1, fixo='2'),
+    Campo('time_mode', 1, 1, fixo='U'),
+    Campo('airline', 2, 2),
+    Campo('spare_1', 4, 2, fixo=' '),
+    Campo('schedule_version', 6, 4, fixo='0008'),
+    Campo('spare_2', 10, 4, fixo=' '),
+    Campo('period_from', 14, 7),
+    Campo('period_to', 21, 7),
+    Campo('creation_date', 28, 7),
+    Campo('title', 35, 32, fixo='Created by AMS Team Dnata Brasil'),
+    Campo('spare_3', 67, 4, fixo=' '),
+    Campo('status', 71, 1, fixo='P'),
+    Campo('spare_4', 72, 116, fixo=' '),
+    Campo('creator_reference', 188, 4, fixo='EN08'),
+    Campo('record_serial', 192, 8, '>', '0'),
+)
+
+# Registro tipo 3 (Flight Leg)
+LAYOUT_TIPO_3 = (
+    Campo('record_type', 0, 1, fixo='3'),
+    Campo('operational_suffix', 1, 1, fixo=' '),
+    Campo('airline', 2, 3),
+    Campo('flight_number', 5, 4),
+    Campo('itinerary_variation', 9, 2),
+    Campo('leg_sequence', 11, 2),
+    Campo('service_type', 13, 1),
+    Campo('period_from', 14, 7),
+    Campo('period_to', 21, 7),
+    Campo('days_of_operation', 28, 7),
+    Campo('frequency_rate', 35, 1, fixo=' '),
+    Campo('departure_station', 36, 3),
+    Campo('passenger_std', 39, 4),
+    Campo('aircraft_std', 43, 4),
+    Campo('departure_utc_variation', 47, 5),
+    Campo('departure_terminal', 52, 2, fixo=' '),
+    Campo('arrival_station', 54, 3),
+    Campo('passenger_sta', 57, 4),
+    Campo('aircraft_sta', 61, 4),
+    Campo('arrival_utc_variation', 65, 5),
+    Campo('arrival_terminal', 70, 2, fixo=' '),
+    Campo('aircraft_type', 72, 3),
+    Campo('onward_spare', 75, 53, fixo=' '),
+    Campo('next_airline', 128, 2),
+    Campo('next_spare_1', 130, 7, fixo=' '),
+    Campo('next_airline_repeat', 137, 2),
+    Campo('next_spare_2', 139, 2, fixo=' '),
+    Campo('next_flight_number', 141, 4, '>'),
+    Campo('spare', 145, 47, fixo=' '),
+    Campo('record_serial', 192, 8, '>', '0'),
+)
+
+# Registro tipo 4 (Segment Data) - não gerado pelo conversor, usado na leitura
+LAYOUT_TIPO_4 = (
+    Campo('record_type', 0, 1, fixo='4'),
+    Campo('operational_suffix', 1, 1),
+    Campo('airline', 2, 3),
+    Campo('flight_number', 5, 4),
+    Campo('itinerary_variation', 9, 2),
+    Campo('leg_sequence', 11, 2),
+    Campo('service_type', 13, 1),
+    Campo('spare_1', 14, 13, fixo=' '),
+    Campo('itinerary_variation_overflow', 27, 1),
+    Campo('board_point_indicator', 28, 1),
+    Campo('off_point_indicator', 29, 1),
+    Campo('data_element_identifier', 30, 3),
+    Campo('board_point', 33, 3),
+    Campo('off_point', 36, 3),
+    Campo('data', 39, 153),
+    Campo('record_serial', 192, 8, '>', '0'),
+)
+
+# Registro tipo 5 (Trailer): "<CIA|MULTI> <data>" + serial da linha + 'E' + próximo serial
+LAYOUT_TIPO_5 = (
+    Campo('record_type', 0, 1, fixo='5'),
+    Campo('spare', 1, 1, fixo=' '),
+    Campo('trailer', 2, 185),
+    Campo('record_serial', 187, 6, '>', '0'),
+    Campo('end_code', 193, 1, fixo='E'),
+    Campo('next_serial', 194, 6, '>', '0'),
+)
+
+# Registro único de layouts por tipo de registro
+LAYOUTS = {
+    1: LAYOUT_TIPO_1,
+    2: LAYOUT_TIPO_2,
+    3: LAYOUT_TIPO_3,
+    4: LAYOUT_TIPO_4,
+    5: LAYOUT_TIPO_5,
+}
+
+
+def _validar_layout(campos, tamanho):
+    """Campos contíguos, sem sobreposição, cobrindo o registro inteiro"""
+    campos = sorted(campos, key=lambda campo: campo.inicio)
+    posicao = 0
+    for campo in campos:
+        if campo.inicio != posicao:
+            raise ValueError(f"Campo '{campo.nome}' começa em {campo.inicio}, esperado {posicao}")
+        if campo.tamanho <= 0 or campo.alinhamento not in '<>' or len(campo.preenchimento) != 1:
+            raise ValueError(f"Campo '{campo.nome}' inválido")
+        if campo.fixo is not None and len(campo.fixo) > campo.tamanho:
+            raise ValueError(f"Valor fixo do campo '{campo.nome}' maior que {campo.tamanho}")
+        posicao = campo.fim
+    if posicao != tamanho:
+        raise ValueError(f"Layout cobre {posicao} posições, esperado {tamanho}")
+    return tuple(campos)
+
+
+class FormatadorRegistro:
+    """
+    Formatador compilado a partir de uma tabela de campos
+
+    Os campos fixos são gravados no template uma única vez; formatar()
+    recebe apenas os valores dos campos variáveis, na ordem da tabela
+    (textos; o serial numérico também aceita int).
+    """
+
+    def __init__(self, campos, tamanho=TAMANHO_REGISTRO):
+        campos = _validar_layout(campos, tamanho)
+        self.campos = campos
+        self.tamanho = tamanho
+        self.campos_variaveis = tuple(campo for campo in campos if campo.fixo is None)
+
+        # Template: '3 {:<3.3}{:<4.4}...' - um único str.format por registro
+        partes = []
+        for campo in campos:
+            if campo.fixo is not None:
+                fixo = self._justificar(campo, campo.fixo)
+                partes.append(fixo.replace('{', '{{').replace('}', '}}'))
+            elif campo.preenchimento == '0' and campo.alinhamento == '>':
+                # Numérico (serial): aceita int ou texto, sem corte
+                partes.append(f"{{:0>{campo.tamanho}}}")
+            else:
+                partes.append(f"{{:{campo.preenchimento}{campo.alinhamento}{campo.tamanho}.{campo.tamanho}}}")
+        self.template = ''.join(partes)
+        self._formatar = self.template.format
+
+    @staticmethod
+    def _justificar(campo, valor):
+        justificar = str.ljust if campo.alinhamento == '<' else str.rjust
+        return justificar(valor, campo.tamanho, campo.preenchimento)[:campo.tamanho]
+
+    def formatar(self, valores):
+        """Registro como texto: valores dos campos variáveis, na ordem da tabela"""
+        return self._formatar(*valores)
+
+
+class LeitorRegistro:
+    """
+    Leitor compilado a partir de uma tabela de campos
+
+    Um struct.Struct extrai todos os campos variáveis de uma vez
+    (campos fixos viram bytes de preenchimento 'x' e são pulados).
+    """
+
+    def __init__(self, campos, tamanho=TAMANHO_REGISTRO):
+        campos = _validar_layout(campos, tamanho)
+        self.campos = campos
+        self.tamanho = tamanho
+        self.campos_variaveis = tuple(campo for campo in campos if campo.fixo is None)
+        self.nomes = tuple(campo.nome for campo in self.campos_variaveis)
+        self._struct = struct.Struct(''.join(
+            f"{campo.tamanho}x" if campo.fixo is not None else f"{campo.tamanho}s" for campo in campos))
+        self._aparar = tuple(
+            (campo.preenchimento if campo.preenchimento == ' ' else None, campo.alinhamento)
+            for campo in self.campos_variaveis)
+
+    def ler_bytes(self, linha):
+        """Tupla com os bytes crus de cada campo variável"""
+        if isinstance(linha, str):
+            linha = linha.encode('latin-1', 'replace')
+        return self._struct.unpack_from(linha)
+
+    def ler(self, linha):
+        """Dicionário campo → texto (sem os espaços de alinhamento)"""
+        valores = {}
+        for nome, bruto, (pad, alinhamento) in zip(self.nomes, self.ler_bytes(linha), self._aparar):
+            texto = bruto.decode('latin-1')
+            if pad is not None:
+                texto = texto.rstrip(pad) if alinhamento == '<' else texto.lstrip(pad)
+            valores[nome] = texto
+        return valores
+
+
+FORMATADORES = {tipo: FormatadorRegistro(layout) for tipo, layout in LAYOUTS.items()}
+LEITORES = {tipo: LeitorRegistro(layout) for tipo, layout in LAYOUTS.items()}
+
+FORMATADOR_TIPO_3 = FORMATADORES[3]
+LEITOR_TIPO_3 = LEITORES[3]
+
+
+def campo(tipo, nome):
+    """Campo de um layout pelo nome (ex.: campo(3, 'flight_number'))"""
+    for item in LAYOUTS[tipo]:
+        if item.nome == nome:
+            return item
+    raise KeyError(f"Registro tipo {tipo} não tem o campo '{nome}'")
+
+
+def ler_registro(linha):
+    """Lê qualquer registro com layout conhecido → (tipo, dicionário de campos)"""
+    primeiro = linha[:1]
+    if isinstance(primeiro, bytes):
+        primeiro = primeiro.decode('latin-1')
+    if not primeiro or primeiro not in '12345':
+        return None, {}
+    tipo = int(primeiro)
+    return tipo, LEITORES[tipo].ler(linha)
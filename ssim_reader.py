@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Leitor SSIM de alto desempenho - AMS Team
+
+SSIMReader mapeia o arquivo em memória (mmap) e usa o passo fixo de
+200 bytes + quebra de linha para ir direto ao registro N, sem carregar
+o arquivo inteiro. Os campos são decodificados pelos layouts de
+ssim_layout; to_dataframe() decodifica colunas inteiras com visões
+NumPy de largura fixa.
+"""
+
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+from ssim_layout import LEITORES, TAMANHO_REGISTRO, campo
+
+
+class RegistroSSIM:
+    """Registro lido do arquivo: bytes crus + campos decodificados sob demanda"""
+
+    __slots__ = ('indice', 'bruto', '_campos')
+
+    def __init__(self, indice, bruto):
+        self.indice = indice
+        self.bruto = bruto
+        self._campos = None
+
+    @property
+    def tipo(self):
+        """Tipo do registro (1-5), 0 para as linhas de zeros, None se desconhecido"""
+        primeiro = self.bruto[:1]
+        return int(primeiro) if primeiro and primeiro in b'012345' else None
+
+    @property
+    def texto(self):
+        return self.bruto.decode('latin-1')
+
+    @property
+    def campos(self):
+        """Dicionário campo → texto, decodificado na primeira vez que é pedido"""
+        if self._campos is None:
+            leitor = LEITORES.get(self.tipo)
+            self._campos = leitor.ler(self.bruto) if leitor is not None else {}
+        return self._campos
+
+    @property
+    def serial(self):
+        """Serial do registro (linhas de zeros usam a própria posição)"""
+        serial = self.campos.get('record_serial')
+        return int(serial) if serial and serial.isdigit() else self.indice + 1
+
+    def __getitem__(self, nome):
+        return self.campos[nome]
+
+    def __repr__(self):
+        return f"RegistroSSIM(indice={self.indice}, tipo={self.tipo}, texto={self.texto.rstrip()!r})"
+
+
+class SSIMReader:
+    """
+    Leitura de arquivos SSIM por mmap com acesso aleatório
+
+    Uso:
+        with SSIMReader("saida.ssim") as reader:
+            reader[10]                  # 11º registro
+            reader.record_by_serial(42)
+            df = reader.to_dataframe()  # registros tipo 3 em colunas
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._arquivo = open(self.path, 'rb')
+        tamanho = os.fstat(self._arquivo.fileno()).st_size
+        self._mm = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ) if tamanho else b''
+
+        # Passo fixo: 200 bytes + '\n' (ou '\r\n' quando gerado no Windows)
+        self.passo = TAMANHO_REGISTRO + 1
+        if tamanho > TAMANHO_REGISTRO and self._mm[TAMANHO_REGISTRO:TAMANHO_REGISTRO + 1] == b'\r':
+            self.passo = TAMANHO_REGISTRO + 2
+        self._total = (tamanho + self.passo - 1) // self.passo
+        self._seriais = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._arquivo.close()
+
+    def __len__(self):
+        return self._total
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += self._total
+        if not 0 <= indice < self._total:
+            raise IndexError(f"Registro {indice} fora do arquivo ({self._total} registros)")
+        inicio = indice * self.passo
+        return RegistroSSIM(indice, self._mm[inicio:inicio + TAMANHO_REGISTRO])
+
+    def __iter__(self):
+        for indice in range(self._total):
+            yield self[indice]
+
+    def iter_tipo(self, tipo):
+        """Somente os registros de um tipo (ex.: 3 = flight legs)"""
+        marcador = str(tipo).encode()
+        for indice in range(self._total):
+            inicio = indice * self.passo
+            if self._mm[inicio:inicio + 1] == marcador:
+                yield self[indice]
+
+    def _matrizes(self):
+        """
+        Registros completos como matriz (registros × passo) de uint8 - visão do mmap, sem cópia -
+        e a cauda: último registro sem quebra de linha completado com '\n' (matriz 1 × passo) ou None
+        """
+        completos = len(self._mm) // self.passo
+        matriz = np.frombuffer(self._mm, dtype=np.uint8, count=completos * self.passo).reshape(-1, self.passo)
+        cauda = None
+        if completos < self._total:
+            # Só o último registro é copiado
+            resto = bytes(self._mm[completos * self.passo:]).ljust(self.passo, b'\n')
+            cauda = np.frombuffer(resto, dtype=np.uint8).reshape(1, self.passo)
+        return matriz, cauda
+
+    def _recorte(self, inicio, fim, linhas=None):
+        """Bytes [inicio:fim) de todos os registros (ou das linhas indicadas) em um array contíguo"""
+        matriz, cauda = self._matrizes()
+        if linhas is None:
+            partes = [matriz[:, inicio:fim]]
+            if cauda is not None:
+                partes.append(cauda[:, inicio:fim])
+        else:
+            completas = linhas < len(matriz)
+            partes = [matriz[linhas[completas], inicio:fim]]
+            if cauda is not None:
+                partes.append(cauda[linhas[~completas] - len(matriz), inicio:fim])
+        # concatenate copia só o recorte: nenhuma visão do mmap sobrevive à chamada
+        return np.concatenate(partes)
+
+    def record_by_serial(self, serial):
+        """Registro pelo serial - direto na posição serial-1, com busca vetorizada como fallback"""
+        if 1 <= serial <= self._total:
+            registro = self[serial - 1]
+            if registro.serial == serial:
+                return registro
+
+        if self._seriais is None:
+            serial_campo = campo(3, 'record_serial')
+            bytes_serial = self._recorte(serial_campo.inicio, serial_campo.fim)
+            texto = bytes_serial.view(f'S{serial_campo.tamanho}').ravel()
+            self._seriais = pd.to_numeric(pd.Series(texto).str.decode('latin-1'), errors='coerce').to_numpy()
+        posicoes = np.flatnonzero(self._seriais == serial)
+        if len(posicoes) == 0:
+            raise KeyError(f"Serial {serial} não encontrado em {self.path}")
+        return self[int(posicoes[0])]
+
+    def to_dataframe(self, tipo=3):
+        """
+        Todos os registros de um tipo como DataFrame (uma coluna por campo)
+        Cada coluna é fatiada da matriz de bytes e decodificada de uma vez
+        """
+        leitor = LEITORES[tipo]
+        if self._total == 0:
+            return pd.DataFrame(columns=['indice', *leitor.nomes])
+
+        indices = np.flatnonzero(self._recorte(0, 1).ravel() == ord(str(tipo)))
+
+        colunas = {'indice': indices}
+        for item in leitor.campos_variaveis:
+            bytes_campo = self._recorte(item.inicio, item.fim, indices)
+            texto = pd.Series(bytes_campo.view(f'S{item.tamanho}').ravel()).str.decode('latin-1')
+            if item.preenchimento == ' ':
+                texto = texto.str.rstrip(' ') if item.alinhamento == '<' else texto.str.lstrip(' ')
+            colunas[item.nome] = texto.to_numpy(dtype=object)
+        return pd.DataFrame(colunas)
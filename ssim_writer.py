@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Escritor SSIM com buffer - AMS Team
+
+SSIMWriter aceita qualquer destino (caminho, arquivo texto/binário,
+io.BytesIO, io.StringIO, gzip) e agrupa as linhas em escritas grandes.
+O contador de linhas (serial) e os registros de header/footer ficam
+dentro do próprio writer; os registros são formatados pelos layouts
+compilados de ssim_layout.
+"""
+
+import gzip
+import io
+import os
+
+from ssim_layout import FORMATADORES, campo
+
+# Linhas de zeros usadas como separador após header/carrier e antes do footer
+REGISTRO_ZEROS = "0" * 200
+
+# Quantidade de registros acumulados antes de cada escrita no destino
+BUFFER_REGISTROS = 4096
+
+
+def registro_header(numero_linha):
+    """Linha 1: cabeçalho do arquivo"""
+    return FORMATADORES[1].formatar((numero_linha,))
+
+
+def registro_carrier(carrier_code, data_emissao, numero_linha):
+    """Linha 2U: informações da companhia (única para todas as companhias)"""
+    return FORMATADORES[2].formatar((carrier_code, data_emissao, data_emissao, data_emissao, numero_linha))
+
+
+def registro_footer(label, data_emissao, numero_linha):
+    """Linha 5: rodapé com o serial da própria linha e o próximo"""
+    return FORMATADORES[5].formatar((f"{label} {data_emissao}", numero_linha, numero_linha + 1))
+
+
+def registros_header(carrier_code, data_emissao, numero_linha=1):
+    """Header + 4 zeros + Carrier Info (2U) + 4 zeros, numerados a partir de numero_linha"""
+    return ([registro_header(numero_linha)] + [REGISTRO_ZEROS] * 4 +
+            [registro_carrier(carrier_code, data_emissao, numero_linha + 5)] + [REGISTRO_ZEROS] * 4)
+
+
+def registros_footer(label, data_emissao, numero_linha):
+    """4 zeros + Footer (5), numerados a partir de numero_linha"""
+    return [REGISTRO_ZEROS] * 4 + [registro_footer(label, data_emissao, numero_linha + 4)]
+
+
+def renumerar_registros(linhas, numero_linha):
+    """
+    Regrava o serial (últimas 8 posições) de registros tipo 3 a partir de numero_linha
+    Usado para juntar blocos gerados separadamente (ex.: um processo por companhia)
+    """
+    serial = campo(3, 'record_serial')
+    inicio, tamanho = serial.inicio, serial.tamanho
+    return [f"{linha[:inicio]}{numero:0{tamanho}d}" for numero, linha in enumerate(linhas, numero_linha)]
+
+def _destino_binario(sink):
+    """True se o destino espera bytes (BytesIO, gzip, open(..., 'wb'))"""
+    if isinstance(sink, io.TextIOBase):
+        return False
+    if isinstance(sink, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    return 'b' in getattr(sink, 'mode', '')
+
+
+class SSIMWriter:
+    """
+    Escreve registros SSIM em qualquer destino com escritas em lote
+
+    Uso:
+        with SSIMWriter("saida.ssim") as writer:
+            writer.write_header("EK", "14OCT25")
+            writer.write_records(linhas_tipo_3)   # numeradas a partir de writer.numero_linha
+            writer.write_footer("EK", "14OCT25")
+    """
+
+    def __init__(self, sink, buffer_registros=BUFFER_REGISTROS, encoding='utf-8'):
+        self.encoding = encoding
+        self.buffer_registros = max(1, buffer_registros)
+        self.numero_linha = 1
+        self._buffer = []
+
+        # Caminho: o writer abre (e fecha) o arquivo; .gz é comprimido
+        if isinstance(sink, (str, os.PathLike)):
+            if os.fspath(sink).endswith('.gz'):
+                self._sink = gzip.open(sink, 'wt', encoding=encoding)
+            else:
+                self._sink = open(sink, 'w', encoding=encoding)
+            self._fechar_sink = True
+        else:
+            self._sink = sink
+            self._fechar_sink = False
+        self._binario = _destino_binario(self._sink)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_record(self, linha):
+        """Adiciona um registro já formatado (sem quebra de linha)"""
+        self._buffer.append(linha)
+        self.numero_linha += 1
+        if len(self._buffer) >= self.buffer_registros:
+            self.flush()
+
+    def write_records(self, linhas):
+        """Adiciona vários registros já formatados e numerados em sequência"""
+        for linha in linhas:
+            self.write_record(linha)
+
+    def write_zeros(self, quantidade=4):
+        """Linhas de zeros (separadores) - também consomem serial"""
+        for _ in range(quantidade):
+            self.write_record(REGISTRO_ZEROS)
+
+    def write_header(self, carrier_code, data_emissao):
+        """Header + 4 zeros + Carrier Info (2U) + 4 zeros"""
+        self.write_records(registros_header(carrier_code, data_emissao, self.numero_linha))
+
+    def write_footer(self, label, data_emissao):
+        """4 zeros + Footer (5)"""
+        self.write_records(registros_footer(label, data_emissao, self.numero_linha))
+
+    def flush(self):
+        """Escreve o buffer acumulado no destino em uma única chamada"""
+        if not self._buffer:
+            return
+        bloco = "\n".join(self._buffer) + "\n"
+        self._buffer = []
+        if self._binario:
+            self._sink.write(bloco.encode(self.encoding))
+        else:
+            self._sink.write(bloco)
+
+    def close(self):
+        """Descarrega o buffer; fecha o destino apenas se foi aberto pelo writer"""
+        self.flush()
+        if self._fechar_sink:
+            self._sink.close()
+        elif hasattr(self._sink, 'flush'):
+            self._sink.flush()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Fusos horários das estações (UTC variation do SSIM) - AMS Team
+
+Tabela embutida IATA → fuso IANA (uma linha por fuso, carregada só no
+primeiro uso) e deslocamentos UTC calculados com zoneinfo, usando a base
+de fusos local (sistema ou pacote tzdata, dependência obrigatória) - nada
+é buscado na rede.
+
+Datas são dias desde 1970-01-01 (inteiros, igual a datetime64[D]). O
+deslocamento de um dia é o do meio-dia local, guardado em cache por
+(estação, dia). As mudanças de horário de verão de cada estação são
+levantadas uma vez por ano e usadas para dividir períodos: cada trecho
+tem deslocamentos constantes em todas as estações do voo.
+
+Uso:
+    from station_timezones import segmentos_periodo, formatar_variacao
+    segmentos_periodo(('JFK', 'AMS'), inicio, fim)
+    # → ((inicio, 20393, (-240, 60)), (20394, 20519, (-300, 60)), ...)
+"""
+
+import bisect
+import functools
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Fuso IANA seguido das estações IATA que o usam
+_TABELA_FUSOS = """
+Europe/Amsterdam AMS EIN RTM GRQ MST
+Europe/Brussels BRU CRL ANR LGG OST
+Europe/Luxembourg LUX
+Europe/Paris CDG ORY NCE LYS MRS TLS BOD NTE BVA MPL BIA SXB
+Europe/London LHR LGW STN LTN LCY MAN BHX BRS EDI GLA ABZ NCL LBA LPL EMA SOU NWI HUY BFS INV EXT CWL
+Europe/Dublin DUB ORK SNN
+Europe/Berlin FRA MUC BER DUS HAM CGN STR HAJ NUE LEJ DRS BRE FMM
+Europe/Zurich ZRH GVA BSL
+Europe/Vienna VIE SZG INN GRZ
+Europe/Rome FCO MXP LIN BGY VCE NAP BLQ FLR PSA CTA PMO BRI CAG OLB TRN VRN
+Europe/Madrid MAD BCN PMI AGP ALC VLC SVQ BIO IBZ MAH
+Atlantic/Canary LPA TFS TFN ACE FUE SPC
+Europe/Lisbon LIS OPO FAO
+Atlantic/Madeira FNC
+Atlantic/Azores PDL
+Europe/Copenhagen CPH BLL AAL
+Europe/Stockholm ARN GOT BMA MMX
+Europe/Oslo OSL BGO TRD SVG TOS
+Europe/Helsinki HEL
+Europe/Warsaw WAW KRK GDN WRO KTW POZ
+Europe/Prague PRG
+Europe/Budapest BUD
+Europe/Bucharest OTP CLJ
+Europe/Sofia SOF VAR BOJ
+Europe/Athens ATH SKG HER RHO CFU JTR JMK KGS CHQ
+Europe/Istanbul IST SAW ESB AYT ADB DLM BJV
+Europe/Belgrade BEG
+Europe/Zagreb ZAG SPU DBV
+Europe/Ljubljana LJU
+Europe/Sarajevo SJJ
+Europe/Skopje SKP
+Europe/Tirane TIA
+Europe/Podgorica TGD TIV
+Europe/Malta MLA
+Asia/Nicosia LCA PFO
+Europe/Riga RIX
+Europe/Vilnius VNO
+Europe/Tallinn TLL
+Europe/Chisinau KIV
+Atlantic/Reykjavik KEF
+Europe/Moscow SVO DME VKO LED
+Asia/Tbilisi TBS
+Asia/Yerevan EVN
+Asia/Baku GYD
+Asia/Dubai DXB DWC SHJ AUH
+Asia/Qatar DOH
+Asia/Bahrain BAH
+Asia/Kuwait KWI
+Asia/Riyadh RUH JED DMM MED
+Asia/Muscat MCT
+Asia/Tehran IKA THR
+Asia/Jerusalem TLV
+Asia/Amman AMM
+Asia/Beirut BEY
+Asia/Baghdad BGW EBL
+Africa/Cairo CAI HRG SSH RMF
+Africa/Casablanca CMN RAK AGA TNG FEZ
+Africa/Algiers ALG
+Africa/Tunis TUN DJE MIR NBE
+Africa/Lagos LOS ABV
+Africa/Accra ACC
+Africa/Abidjan ABJ
+Africa/Dakar DSS
+Africa/Douala DLA
+Africa/Kinshasa FIH
+Africa/Luanda LAD
+Africa/Nairobi NBO MBA
+Africa/Addis_Ababa ADD
+Africa/Dar_es_Salaam DAR JRO ZNZ
+Africa/Kampala EBB
+Africa/Kigali KGL
+Africa/Johannesburg JNB CPT DUR
+Africa/Windhoek WDH
+Atlantic/Cape_Verde SID BVC
+Indian/Mauritius MRU
+Indian/Mahe SEZ
+Indian/Maldives MLE
+Asia/Kolkata DEL BOM BLR MAA HYD CCU COK AMD GOI
+Asia/Karachi KHI LHE ISB
+Asia/Colombo CMB
+Asia/Dhaka DAC
+Asia/Kathmandu KTM
+Asia/Almaty ALA
+Asia/Tashkent TAS
+Asia/Singapore SIN
+Asia/Kuala_Lumpur KUL PEN
+Asia/Bangkok BKK DMK HKT CNX
+Asia/Ho_Chi_Minh SGN HAN DAD
+Asia/Jakarta CGK
+Asia/Makassar DPS
+Asia/Manila MNL CEB
+Asia/Hong_Kong HKG
+Asia/Macau MFM
+Asia/Taipei TPE
+Asia/Shanghai PEK PKX PVG SHA CAN SZX CTU TFU CKG XIY HGH KMG XMN
+Asia/Tokyo NRT HND KIX NGO FUK CTS
+Asia/Seoul ICN GMP PUS
+Australia/Sydney SYD
+Australia/Melbourne MEL
+Australia/Brisbane BNE OOL
+Australia/Adelaide ADL
+Australia/Perth PER
+Pacific/Auckland AKL CHC
+Pacific/Fiji NAN
+America/New_York JFK EWR LGA BOS IAD DCA BWI PHL ATL MIA FLL MCO TPA CLT DTW PIT RDU
+America/Chicago ORD MDW DFW IAH HOU MSP MSY STL MCI AUS SAT BNA
+America/Denver DEN SLC
+America/Phoenix PHX
+America/Los_Angeles LAX SFO SEA SAN LAS PDX SJC OAK
+America/Anchorage ANC
+Pacific/Honolulu HNL
+America/Toronto YYZ YUL YOW
+America/Vancouver YVR
+America/Edmonton YYC YEG
+America/Winnipeg YWG
+America/Halifax YHZ
+Atlantic/Bermuda BDA
+America/Mexico_City MEX GDL
+America/Cancun CUN
+America/Havana HAV VRA
+America/Nassau NAS
+America/Jamaica KIN MBJ
+America/Santo_Domingo PUJ SDQ
+America/Puerto_Rico SJU
+America/Costa_Rica SJO LIR
+America/Panama PTY
+America/Curacao CUR
+America/Aruba AUA
+America/Kralendijk BON
+America/Lower_Princes SXM
+America/Martinique FDF
+America/Guadeloupe PTP
+America/Barbados BGI
+America/Port_of_Spain POS
+America/Paramaribo PBM
+America/Cayenne CAY
+America/Caracas CCS
+America/Bogota BOG MDE CTG
+America/Guayaquil UIO GYE
+America/Lima LIM
+America/Sao_Paulo GRU GIG CGH VCP BSB CNF POA CWB REC SSA FOR
+America/Argentina/Buenos_Aires EZE AEP
+America/Montevideo MVD
+America/Asuncion ASU
+America/Santiago SCL
+"""
+
+# Estação remota fora da tabela (ou fuso ausente na base local): variação do SSIM sem fuso
+# (a estação base nunca cai aqui - o conversor falha, ver verificar_fuso_base)
+VARIACAO_PADRAO = "+0000"
+
+_EPOCA = date(1970, 1, 1)
+
+
+@functools.cache
+def fusos_estacoes():
+    """Dicionário IATA → nome do fuso IANA (montado no primeiro uso)"""
+    fusos = {}
+    for linha in _TABELA_FUSOS.split("\n"):
+        if linha.strip():
+            fuso, *estacoes = linha.split()
+            fusos.update(dict.fromkeys(estacoes, fuso))
+    return fusos
+
+
+@functools.cache
+def fuso_estacao(estacao):
+    """ZoneInfo da estação ou None (estação desconhecida ou fuso fora da base local)"""
+    nome = fusos_estacoes().get(estacao)
+    if nome is None:
+        return None
+    try:
+        return ZoneInfo(nome)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def data_do_dia(dia):
+    """Dias desde 1970-01-01 → date"""
+    return _EPOCA + timedelta(days=dia)
+
+
+@functools.lru_cache(maxsize=65536)
+def deslocamento_utc(estacao, dia):
+    """Minutos em relação a UTC ao meio-dia local do dia, ou None sem fuso conhecido"""
+    fuso = fuso_estacao(estacao)
+    if fuso is None:
+        return None
+    data = data_do_dia(dia)
+    return int(datetime(data.year, data.month, data.day, 12, tzinfo=fuso).utcoffset().total_seconds() // 60)
+
+
+@functools.lru_cache(maxsize=4096)
+def mudancas_fuso(estacao, ano):
+    """Dias do ano em que o deslocamento da estação muda em relação ao dia anterior"""
+    if fuso_estacao(estacao) is None:
+        return ()
+    inicio = (date(ano, 1, 1) - _EPOCA).days
+    fim = (date(ano + 1, 1, 1) - _EPOCA).days
+    return tuple(dia for dia in range(inicio, fim)
+                 if deslocamento_utc(estacao, dia) != deslocamento_utc(estacao, dia - 1))
+
+
+def _mudancas_entre(estacao, inicio, fim):
+    """Mudanças de deslocamento da estação em (inicio, fim]"""
+    mudancas = []
+    for ano in range(data_do_dia(inicio).year, data_do_dia(fim).year + 1):
+        dias = mudancas_fuso(estacao, ano)
+        mudancas.extend(dias[bisect.bisect_right(dias, inicio):bisect.bisect_right(dias, fim)])
+    return mudancas
+
+
+def segmentos_periodo(estacoes, inicio, fim):
+    """
+    Divide o período [inicio, fim] nas mudanças de horário de qualquer uma das estações
+    Retorna ((inicio, fim, deslocamentos), ...) com um deslocamento (ou None) por estação
+    """
+    cortes = [inicio]
+    if fim > inicio:
+        cortes += sorted({dia for estacao in estacoes for dia in _mudancas_entre(estacao, inicio, fim)})
+    finais = [corte - 1 for corte in cortes[1:]] + [fim]
+    return tuple((de, ate, tuple(deslocamento_utc(estacao, de) for estacao in estacoes))
+                 for de, ate in zip(cortes, finais))
+
+
+def formatar_variacao(minutos):
+    """Deslocamento em minutos → variação UTC do SSIM ('+0100', '-0430', '+0545'); None → VARIACAO_PADRAO"""
+    if minutos is None:
+        return VARIACAO_PADRAO
+    sinal = '-' if minutos < 0 else '+'
+    horas, resto = divmod(abs(minutos), 60)
+    return f"{sinal}{horas:02d}{resto:02d}"
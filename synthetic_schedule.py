@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Gerador de malhas W25 sintéticas - AMS Team
+
+Monta DataFrames (ou planilhas) com as mesmas colunas da malha real de
+Amsterdã: turnarounds (A.FLT + D.FLT na mesma linha) e night stops
+(chegada com DEST = N/S e a saída do dia seguinte em outra linha com
+ORIG = N/S). Companhias, quantidade de linhas, proporção de night stops
+e padrões de dias são configuráveis. Serve para benchmarks e testes sem
+depender da malha privada.
+
+Uso:
+    from synthetic_schedule import gerar_malha_sintetica
+    df = gerar_malha_sintetica(100_000, companhias=('EK', 'KL'), proporcao_ns=0.15, seed=1)
+"""
+
+from datetime import time
+
+import numpy as np
+import pandas as pd
+
+from schedule_loader import COLUNAS_DIAS
+
+COMPANHIAS_PADRAO = ('KL', 'EK', '6E', 'LH', 'AF', 'BA', 'DL', 'U2', 'HV', 'TK')
+ESTACOES_PADRAO = ('DXB', 'JFK', 'LHR', 'CDG', 'FRA', 'BOM', 'DEL', 'GRU', 'NRT', 'SIN',
+                   'IST', 'MAD', 'BCN', 'FCO', 'ATL', 'YYZ', 'CPT', 'NBO', 'DOH', 'HKG')
+AERONAVES_PADRAO = ('77W', '789', '320/321', '738', 'E90', '333', '388', '32N')
+TIPOS_VOO_PADRAO = ('J/J', 'J/J', 'J/J', 'J/J', 'F/F', 'C/C', 'J/F')
+
+# Máscaras de dias (bit 0 = segunda): diário, dias úteis, fim de semana, 3x e 2x por semana
+PADROES_DIAS_PADRAO = (0b1111111, 0b0011111, 0b1100000, 0b0010101, 0b1001010, 0b0100100)
+
+# Temporada W25
+INICIO_TEMPORADA = pd.Timestamp('2025-10-26')
+FIM_TEMPORADA = pd.Timestamp('2026-03-28')
+
+# Horários como datetime.time (igual à leitura do Excel), indexados pelo minuto do dia
+_HORARIOS = np.array([time(minuto // 60, minuto % 60) for minuto in range(1440)], dtype=object)
+
+
+def _colunas_dias(mascaras):
+    """Máscaras → colunas OP.D.1 … OP/D/7 (número do dia ou vazio)"""
+    return {coluna: np.where((mascaras >> bit) & 1 == 1, float(bit + 1), np.nan)
+            for bit, coluna in enumerate(COLUNAS_DIAS)}
+
+
+def gerar_malha_sintetica(linhas=1000, companhias=COMPANHIAS_PADRAO, proporcao_ns=0.1,
+                          padroes_dias=PADROES_DIAS_PADRAO, estacoes=ESTACOES_PADRAO, seed=0):
+    """
+    Malha W25 sintética com `linhas` linhas
+    proporcao_ns: fração das linhas que pertencem a night stops (cada night stop = 2 linhas)
+    """
+    rng = np.random.default_rng(seed)
+    companhias = np.asarray(companhias, dtype=object)
+    estacoes = np.asarray(estacoes, dtype=object)
+    padroes_dias = np.asarray(padroes_dias, dtype=np.int64)
+
+    pares_ns = int(linhas * proporcao_ns) // 2
+    voos = linhas - pares_ns           # turnarounds + chegadas em night stop
+    night_stop = np.zeros(voos, dtype=bool)
+    night_stop[rng.choice(voos, pares_ns, replace=False)] = True
+
+    cia = companhias[rng.integers(0, len(companhias), voos)]
+    numero = rng.integers(1, 4999, voos) * 2
+    a_flt = cia + pd.Series(numero).map('{:04d}'.format).to_numpy(dtype=object)
+    d_flt = cia + pd.Series(numero + 1).map('{:04d}'.format).to_numpy(dtype=object)
+
+    sta = rng.integers(0, 1440, voos)
+    std = (sta + rng.integers(60, 240, voos)) % 1440
+    mascaras = padroes_dias[rng.integers(0, len(padroes_dias), voos)]
+
+    semanas = (FIM_TEMPORADA - INICIO_TEMPORADA).days // 7
+    inicio = rng.integers(0, semanas // 2, voos)
+    duracao = rng.integers(4, semanas - semanas // 2, voos)
+    data_from = INICIO_TEMPORADA + pd.to_timedelta(inicio * 7, unit='D')
+    data_till = np.minimum(data_from + pd.to_timedelta(duracao * 7, unit='D'), FIM_TEMPORADA)
+
+    chegadas = pd.DataFrame({
+        'A.FLT': a_flt,
+        'STA': _HORARIOS[sta],
+        'ORIG': estacoes[rng.integers(0, len(estacoes), voos)],
+        'ATY': np.asarray(AERONAVES_PADRAO, dtype=object)[rng.integers(0, len(AERONAVES_PADRAO), voos)],
+        'D.FLT': np.where(night_stop, None, d_flt),
+        'STD': np.where(night_stop, None, _HORARIOS[std]),
+        'DEST': np.where(night_stop, 'N/S', estacoes[rng.integers(0, len(estacoes), voos)]),
+        'FROM': data_from,
+        'TILL': data_till,
+        'FLT.TYPE': np.asarray(TIPOS_VOO_PADRAO, dtype=object)[rng.integers(0, len(TIPOS_VOO_PADRAO), voos)],
+        **_colunas_dias(mascaras),
+    })
+
+    # Saída após o pernoite: ORIG = N/S, A.FLT = voo de chegada, dias e período deslocados +1
+    ns = np.flatnonzero(night_stop)
+    saidas = chegadas.iloc[ns].copy()
+    dias_seguintes = ((mascaras[ns] << 1) | (mascaras[ns] >> 6)) & 0b1111111
+    saidas['STA'] = None
+    saidas['ORIG'] = 'N/S'
+    saidas['D.FLT'] = d_flt[ns]
+    saidas['STD'] = _HORARIOS[rng.integers(360, 840, len(ns))]
+    saidas['DEST'] = chegadas['ORIG'].to_numpy()[ns]
+    saidas['FROM'] = saidas['FROM'] + pd.Timedelta(days=1)
+    saidas['TILL'] = saidas['TILL'] + pd.Timedelta(days=1)
+    for coluna, valores in _colunas_dias(dias_seguintes).items():
+        saidas[coluna] = valores
+
+    # Cada saída logo depois da sua chegada, como na malha real
+    ordem = np.concatenate([np.arange(voos) * 2, ns * 2 + 1])
+    malha = pd.concat([chegadas, saidas], ignore_index=True)
+    return malha.iloc[np.argsort(ordem, kind='stable')].reset_index(drop=True)
+
+
+def salvar_malha_sintetica(caminho, linhas=1000, **opcoes):
+    """Grava a malha sintética em Excel (mesmo formato da planilha W25) e devolve o DataFrame"""
+    malha = gerar_malha_sintetica(linhas, **opcoes)
+    malha.to_excel(caminho, index=False)
+    return malha
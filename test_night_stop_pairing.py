@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Testes do pareamento de night stops (parear_night_stops) - AMS Team
+
+Malhas mínimas do synthetic_schedule: uma chegada em night stop (DEST = N/S)
+e a saída do dia seguinte (ORIG = N/S) na linha de baixo.
+
+    python -m pytest test_night_stop_pairing.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from synthetic_schedule import gerar_malha_sintetica
+from w25_to_ssim_converter import normalizar_schedule
+
+SEGUNDA, DOMINGO = 0b0000001, 0b1000000
+
+
+def _night_stop(padrao_dias=0b0011111, companhia='KL'):
+    """Chegada N/S (linha 0) + saída após o pernoite (linha 1), dias e período deslocados +1"""
+    df = gerar_malha_sintetica(2, companhias=(companhia,), proporcao_ns=1.0, padroes_dias=(padrao_dias,), seed=3)
+    assert list(df['DEST'])[0] == 'N/S' and list(df['ORIG'])[1] == 'N/S'
+    return df
+
+
+def _proximo_voo_chegada(df):
+    df_norm = normalizar_schedule(df)
+    return df_norm['numero_a'].iloc[0], df_norm['proximo_voo'].iloc[0], df_norm['numero_d'].iloc[1]
+
+
+def test_chegada_pareada_com_saida_do_dia_seguinte():
+    chegada, proximo, saida = _proximo_voo_chegada(_night_stop())
+    assert proximo == saida != chegada
+
+
+@pytest.mark.parametrize('a_flt', [None, 'N/S'])
+def test_saida_sem_voo_de_chegada_pareada_pela_companhia(a_flt):
+    df = _night_stop()
+    df.loc[1, 'A.FLT'] = a_flt
+    chegada, proximo, saida = _proximo_voo_chegada(df)
+    assert proximo == saida != chegada
+
+
+def test_saida_sem_voo_de_chegada_usada_por_uma_so_chegada():
+    df = _night_stop()
+    df.loc[1, 'A.FLT'] = None
+    # Segunda chegada N/S da mesma companhia, nos mesmos dias, antes da saída
+    outra = df.iloc[[0]].assign(**{'A.FLT': 'KL0001'})
+    df = pd.concat([df.iloc[[0]], outra, df.iloc[[1]]], ignore_index=True)
+    df_norm = normalizar_schedule(df)
+    assert df_norm['proximo_voo'].iloc[0] == df_norm['numero_d'].iloc[2]
+    assert df_norm['proximo_voo'].iloc[1] == df_norm['numero_a'].iloc[1]
+
+
+def test_chegada_sem_par_mantem_o_proprio_voo():
+    df = _night_stop(SEGUNDA)
+    # Saída no mesmo dia da chegada (segunda): não é o dia seguinte
+    df.loc[1, 'OP.D.1'], df.loc[1, 'OP.D.2'] = 1.0, np.nan
+    chegada, proximo, _ = _proximo_voo_chegada(df)
+    assert proximo == chegada
+
+
+def test_pernoite_de_domingo_para_segunda():
+    df = _night_stop(DOMINGO)
+    assert df.loc[0, 'OP/D/7'] == 7 and df.loc[1, 'OP.D.1'] == 1
+    chegada, proximo, saida = _proximo_voo_chegada(df)
+    assert proximo == saida != chegada
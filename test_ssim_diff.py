@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Testes do diff de arquivos SSIM (ssim_diff) - AMS Team
+
+O arquivo antigo vem do conversor (malha sintética); o novo é o mesmo
+arquivo com um voo removido, um alterado e um incluído, renumerado.
+
+    python -m pytest test_ssim_diff.py
+"""
+
+import io
+
+import pytest
+
+from ssim_diff import diff_ssim, main
+from ssim_layout import campo
+from synthetic_schedule import gerar_malha_sintetica
+from w25_to_ssim_converter import gerar_ssim_completo
+
+SERIAL = campo(3, 'record_serial')
+AERONAVE = campo(3, 'aircraft_type')
+NUMERO_VOO = campo(3, 'flight_number')
+
+
+def _trocar(linha, item, valor):
+    return linha[:item.inicio] + valor + linha[item.fim:]
+
+
+def _renumerar(linhas):
+    return [_trocar(linha, SERIAL, f"{numero:08d}") for numero, linha in enumerate(linhas, 1)]
+
+
+def _gravar(caminho, linhas):
+    caminho.write_text("".join(f"{linha}\n" for linha in linhas), encoding='latin-1')
+    return caminho
+
+
+@pytest.fixture(scope="module")
+def linhas_antigas():
+    saida = io.BytesIO()
+    gerar_ssim_completo(gerar_malha_sintetica(200, companhias=('KL',), seed=5), ['KL'], saida)
+    return saida.getvalue().decode('latin-1').splitlines()
+
+
+def _chave(linha):
+    return tuple(linha[campo(3, nome).inicio:campo(3, nome).fim].strip()
+                 for nome in ('airline', 'flight_number', 'itinerary_variation', 'leg_sequence',
+                              'period_from', 'period_to'))
+
+
+def test_arquivos_iguais(tmp_path, linhas_antigas):
+    antigo = _gravar(tmp_path / "antigo.ssim", linhas_antigas)
+    resultado = diff_ssim(antigo, antigo)
+    assert not resultado.tem_diferencas
+    assert resultado.inalterados == sum(linha[0] == '3' for linha in linhas_antigas)
+    assert main([str(antigo), str(antigo)]) == 0
+
+
+def test_incluidos_removidos_e_alterados(tmp_path, linhas_antigas, capsys):
+    tipo_3 = [indice for indice, linha in enumerate(linhas_antigas) if linha[0] == '3']
+    removido, alterado, copiado = tipo_3[0], tipo_3[1], tipo_3[2]
+    aeronave_antes = linhas_antigas[alterado][AERONAVE.inicio:AERONAVE.fim]
+    assert aeronave_antes != 'ZZZ'
+
+    novas = list(linhas_antigas)
+    incluido = _trocar(novas[copiado], NUMERO_VOO, '9999')
+    novas[alterado] = _trocar(novas[alterado], AERONAVE, 'ZZZ')
+    novas.insert(copiado + 1, incluido)
+    del novas[removido]
+    # Seriais mudam em todo o arquivo: não contam como alteração
+    antigo = _gravar(tmp_path / "antigo.ssim", linhas_antigas)
+    novo = _gravar(tmp_path / "novo.ssim", _renumerar(novas))
+
+    resultado = diff_ssim(antigo, novo)
+    assert resultado.adicionados == [_chave(incluido)]
+    assert resultado.removidos == [_chave(linhas_antigas[removido])]
+    assert [alteracao.chave for alteracao in resultado.alterados] == [_chave(linhas_antigas[alterado])]
+    assert resultado.alterados[0].campos == {'aircraft_type': (aeronave_antes, 'ZZZ')}
+    assert resultado.inalterados == len(tipo_3) - 2
+
+    mudancas = resultado.to_dataframe()
+    assert sorted(mudancas['change']) == ['added', 'modified', 'removed']
+    assert main([str(antigo), str(novo)]) == 1
+    assert "Alterados: 1" in capsys.readouterr().out
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Testes da reconversão incremental (ssim_incremental) - AMS Team
+
+A saída com state_dir tem que ser idêntica à conversão completa, com as
+companhias sem alteração vindas dos blocos gravados.
+
+    python -m pytest test_ssim_incremental.py
+"""
+
+import io
+import logging
+import re
+
+import pytest
+
+from ssim_incremental import EstadoIncremental, nome_origem
+from synthetic_schedule import gerar_malha_sintetica
+from w25_to_ssim_converter import gerar_ssim_completo
+
+COMPANHIAS = ('KL', 'EK', 'LH', 'AF')
+
+
+@pytest.fixture(scope="module")
+def malha():
+    return gerar_malha_sintetica(400, companhias=COMPANHIAS, seed=11)
+
+
+def _converter(df, caplog, **opcoes):
+    """Bytes do SSIM + (reaproveitadas, geradas de novo) do resumo incremental"""
+    saida = io.BytesIO()
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="w25_to_ssim_converter"):
+        assert gerar_ssim_completo(df, None, saida, **opcoes) is not None
+    resumo = re.search(r"(\d+) companhias reaproveitadas, (\d+) geradas de novo", caplog.text)
+    return saida.getvalue(), tuple(map(int, resumo.groups())) if resumo else None
+
+
+def test_sem_alteracao_reaproveita_todas(tmp_path, malha, caplog):
+    completo, _ = _converter(malha, caplog)
+    primeira, contagem = _converter(malha, caplog, state_dir=tmp_path)
+    assert primeira == completo and contagem == (0, len(COMPANHIAS))
+
+    segunda, contagem = _converter(malha, caplog, state_dir=tmp_path)
+    assert segunda == completo and contagem == (len(COMPANHIAS), 0)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_so_a_companhia_alterada_e_gerada_de_novo(tmp_path, malha, caplog, workers):
+    _converter(malha, caplog, state_dir=tmp_path, workers=workers)
+
+    alterada = malha.copy()
+    linhas_kl = alterada['A.FLT'].astype(str).str.startswith('KL')
+    alterada.loc[linhas_kl, 'ATY'] = '77W'
+    completo, _ = _converter(alterada, caplog)
+
+    incremental, contagem = _converter(alterada, caplog, state_dir=tmp_path, workers=workers)
+    # Seriais refeitos ao juntar blocos gravados e novos: arquivo idêntico
+    assert incremental == completo
+    assert contagem == (len(COMPANHIAS) - 1, 1)
+
+
+def test_estado_separado_por_malha(tmp_path):
+    linhas_a, linhas_b = ['3 KL A'], ['3 KL B']
+    estado_a = EstadoIncremental(tmp_path, nome_origem('/malhas/semana_a.xlsx'))
+    estado_b = EstadoIncremental(tmp_path, nome_origem('/malhas/semana_b.xlsx'))
+    estado_a.guardar('KL', 'a1', linhas_a)
+    estado_b.guardar('KL', 'b1', linhas_b)
+
+    # A mesma companhia em outra malha não apaga o bloco desta
+    assert estado_a.bloco('KL', 'a1') == linhas_a
+    assert estado_b.bloco('KL', 'b1') == linhas_b
+
+    # Nova impressão substitui a anterior da mesma malha, sem deixar temporários
+    estado_a.guardar('KL', 'a2', linhas_b)
+    assert estado_a.bloco('KL', 'a1') is None and estado_a.bloco('KL', 'a2') == linhas_b
+    assert sorted(p.name for p in (tmp_path / 'semana_a').iterdir()) == ['KL-a2.ssim3']
+    assert estado_a.reaproveitadas == ['KL', 'KL'] and estado_a.regeneradas == ['KL', 'KL']
+
+
+def test_nome_origem():
+    class Upload(io.BytesIO):
+        name = 'W25 COMBINED.xlsx'
+
+    assert nome_origem('dados/W25.xlsx') == 'W25'
+    assert nome_origem(Upload()) == 'W25 COMBINED'
+    assert nome_origem(gerar_malha_sintetica(2)) is None
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Testes do leitor SSIM por mmap (ssim_reader) - AMS Team
+
+Arquivo gerado pelo conversor a partir de uma malha sintética e reescrito
+com quebras de linha \\r\\n e sem a quebra final.
+
+    python -m pytest test_ssim_reader.py
+"""
+
+import io
+
+import pytest
+
+from ssim_layout import TAMANHO_REGISTRO, campo
+from ssim_reader import SSIMReader
+from synthetic_schedule import gerar_malha_sintetica
+from w25_to_ssim_converter import gerar_ssim_completo
+
+
+@pytest.fixture(scope="module")
+def ssim_lf():
+    """Bytes de um SSIM gerado (uma companhia por vez, \\n no fim de cada registro)"""
+    saida = io.BytesIO()
+    gerar_ssim_completo(gerar_malha_sintetica(300, seed=8), ['KL', 'EK'], saida)
+    return saida.getvalue()
+
+
+def _variantes(dados):
+    crlf = dados.replace(b'\n', b'\r\n')
+    return {'lf': dados, 'lf_sem_final': dados.rstrip(b'\n'),
+            'crlf': crlf, 'crlf_sem_final': crlf.rstrip(b'\r\n')}
+
+
+def _gravar(tmp_path, nome, dados):
+    caminho = tmp_path / f"{nome}.ssim"
+    caminho.write_bytes(dados)
+    return caminho
+
+
+def test_registros_e_tipos(tmp_path, ssim_lf):
+    linhas = ssim_lf.decode('latin-1').splitlines()
+    with SSIMReader(_gravar(tmp_path, 'lf', ssim_lf)) as reader:
+        assert len(reader) == len(linhas)
+        assert reader[0].tipo == 1 and reader[-1].texto == linhas[-1]
+        assert [registro.texto for registro in reader.iter_tipo(3)] == [l for l in linhas if l[0] == '3']
+
+
+@pytest.mark.parametrize('variante', ['lf_sem_final', 'crlf', 'crlf_sem_final'])
+def test_quebras_de_linha_e_ultimo_registro_sem_quebra(tmp_path, ssim_lf, variante):
+    with SSIMReader(_gravar(tmp_path, 'lf', ssim_lf)) as reader:
+        esperado_tipo_3, esperado_tipo_5 = reader.to_dataframe(), reader.to_dataframe(5)
+        total = len(reader)
+
+    with SSIMReader(_gravar(tmp_path, variante, _variantes(ssim_lf)[variante])) as reader:
+        assert len(reader) == total
+        assert reader.to_dataframe().equals(esperado_tipo_3)
+        # Tipo 5 fica perto do fim: passa pela cauda quando não há quebra final
+        assert reader.to_dataframe(5).equals(esperado_tipo_5)
+        ultimo = reader[-1]
+        assert len(ultimo.bruto) == TAMANHO_REGISTRO and ultimo.tipo is not None
+
+
+@pytest.mark.parametrize('variante', ['lf', 'lf_sem_final', 'crlf_sem_final'])
+def test_record_by_serial_busca_vetorizada(tmp_path, ssim_lf, variante):
+    """
+    Sem o header, o serial N não está na posição N-1: usa a busca pelos seriais
+    O arquivo termina no último tipo 3 (sem quebra final nas variantes *_sem_final)
+    """
+    linhas = ssim_lf.split(b'\n')
+    tipo_3 = [indice for indice, linha in enumerate(linhas) if linha[:1] == b'3']
+    dados = _variantes(b'\n'.join(linhas[1:tipo_3[-1] + 1]) + b'\n')[variante]
+    serial_campo = campo(3, 'record_serial')
+    primeiro, ultimo = (int(linhas[indice][serial_campo.inicio:serial_campo.fim]) for indice in (tipo_3[0], tipo_3[-1]))
+
+    with SSIMReader(_gravar(tmp_path, variante, dados)) as reader:
+        assert reader.record_by_serial(ultimo).indice == len(reader) - 1
+        assert reader.record_by_serial(primeiro).indice == tipo_3[0] - 1
+        with pytest.raises(KeyError):
+            reader.record_by_serial(10_000_000)
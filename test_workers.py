@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Testes da geração paralela por companhia (workers=N) - AMS Team
+
+Com processos, os blocos de cada companhia voltam na ordem da lista e os
+seriais são refeitos: a saída tem que ser igual byte a byte à serial.
+
+    python -m pytest test_workers.py
+"""
+
+import io
+
+import pytest
+
+from synthetic_schedule import gerar_malha_sintetica
+from w25_to_ssim_converter import gerar_ssim_completo, iter_ssim_records, preparar_schedule
+
+
+@pytest.fixture(scope="module")
+def preparado():
+    return preparar_schedule(gerar_malha_sintetica(1500, seed=15))
+
+
+def _arquivo(preparado, **opcoes):
+    saida = io.BytesIO()
+    assert gerar_ssim_completo(preparado, None, saida, **opcoes) is not None
+    return saida.getvalue()
+
+
+def test_arquivo_multi_igual_ao_serial(preparado):
+    serial = _arquivo(preparado)
+    assert _arquivo(preparado, workers=2) == serial
+
+
+def test_registros_na_ordem_pedida(preparado):
+    companhias = ['LH', 'KL', 'EK']
+    serial = list(iter_ssim_records(preparado, companhias, data_emissao='01JAN26'))
+    assert list(iter_ssim_records(preparado, companhias, data_emissao='01JAN26', workers=2)) == serial
+
+
+def test_um_arquivo_por_companhia_igual_ao_serial(tmp_path, preparado):
+    serial = gerar_ssim_completo(preparado, None, tmp_path / 'serial', split_by_carrier=True)
+    paralelo = gerar_ssim_completo(preparado, None, tmp_path / 'paralelo', split_by_carrier=True, workers=2)
+    assert len(serial) == len(preparado.companhias)
+    for caminho_serial, caminho_paralelo in zip(serial, paralelo):
+        with open(caminho_serial, 'rb') as a, open(caminho_paralelo, 'rb') as b:
+            assert a.read() == b.read()
@@ -13,19 +13,74 @@ CHANGELOG v1.0.0 - 14/10/2025:
 ✅ Formato 100% compatível com IATA SSIM padrão
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import functools
+import itertools
+import logging
+import numbers
+import os
 import re
+import zipfile
+from typing import NamedTuple
 
-def extrair_airline(flight_number):
+from pipeline_profiler import medir, medir_execucao
+from schedule_cache import chave_cache, gravar_cache, ler_cache
+from schedule_loader import COLUNAS_DIAS, carregar_schedule
+from ssim_incremental import EstadoIncremental, impressao_digital, nome_origem
+from ssim_layout import FORMATADOR_TIPO_3
+from ssim_writer import SSIMWriter, registros_footer, registros_header, renumerar_registros
+from station_timezones import formatar_variacao, fuso_estacao, segmentos_periodo
+
+logger = logging.getLogger(__name__)
+
+# Linhas da malha entre dois eventos de progresso da etapa 'build' (progress_callback)
+PROGRESS_EVERY = 5000
+
+# Designador de voo: companhia (2 primeiros caracteres) + número + sufixo operacional opcional
+_DESIGNADOR_RE = re.compile(r'([A-Z0-9]{1,2})?.*?(?:(?<=[0-9])([A-Z]))?$', re.DOTALL)
+
+# Tamanho padrão do cache de designadores (a malha repete poucos milhares de voos)
+DESIGNATOR_CACHE_SIZE = 4096
+
+def _parse_designator_texto(flight_str):
+    """Decompõe um designador já normalizado (strip/upper) em (airline, número, sufixo)"""
+    match = _DESIGNADOR_RE.match(flight_str)
+    airline, sufixo = match.group(1), match.group(2) or ""
+    if airline is not None and len(airline) < 2:
+        airline += "X"
+
+    # Número: tudo depois dos 2 primeiros caracteres, só dígitos, com zeros até 4 dígitos
+    numero_limpo = ''.join(c for c in flight_str[2:] if c in '0123456789')
+    numero = numero_limpo.zfill(4) if len(flight_str) > 2 and numero_limpo else "0001"
+    return airline, numero, sufixo
+
+_parse_designator_cache = functools.lru_cache(maxsize=DESIGNATOR_CACHE_SIZE)(_parse_designator_texto)
+
+def configure_designator_cache(maxsize=DESIGNATOR_CACHE_SIZE):
+    """Recria o cache de designadores com outro tamanho (None = ilimitado, 0 = sem cache)"""
+    global _parse_designator_cache
+    _parse_designator_cache = functools.lru_cache(maxsize=maxsize)(_parse_designator_texto)
+
+def designator_cache_info():
+    """Estatísticas do cache de designadores (hits, misses, maxsize, currsize)"""
+    return _parse_designator_cache.cache_info()
+
+def parse_designator(flight_number):
+    """
+    Decompõe um designador de voo em (airline, número, sufixo)
+    Exemplo: 6E0021 → ('6E', '0021', ''), KL1234A → ('KL', '1234', 'A')
+    Vazio ou N/S → (None, None, None)
+    """
     if pd.isna(flight_number) or flight_number == 'N/S':
-        return None
-    flight_str = str(flight_number).strip().upper()
-    match = re.match(r'^([A-Z0-9]{1,3})', flight_str)
-    if match:
-        airline = match.group(1)
-        return airline[:2] if len(airline) >= 2 else airline + "X"
-    return None
+        return None, None, None
+    return _parse_designator_cache(str(flight_number).strip().upper())
+
+def extrair_airline(flight_number):
+    return parse_designator(flight_number)[0]
 
 def extrair_numero_voo(flight_number):
     """
@@ -35,24 +90,7 @@ def extrair_numero_voo(flight_number):
     3. Preencher com zeros até ter 4 dígitos
     Exemplo: 6E21 → remove 6E → fica 21 → zfill(4) → 0021
     """
-    if pd.isna(flight_number) or flight_number == 'N/S':
-        return None
-    
-    # Converter para string
-    flight_str = str(flight_number).strip().upper()
-    
-    # Remover os 2 primeiros caracteres (airline)
-    if len(flight_str) > 2:
-        numero_parte = flight_str[2:]  # Pega tudo depois dos 2 primeiros
-        
-        # Remover caracteres não numéricos
-        numero_limpo = re.sub(r'[^0-9]', '', numero_parte)
-        
-        if numero_limpo:
-            # Preencher com zeros até 4 dígitos
-            return numero_limpo.zfill(4)
-    
-    return "0001"  # Fallback
+    return parse_designator(flight_number)[1]
 
 def processar_aircraft_type(aty_value):
     if pd.isna(aty_value):
@@ -63,27 +101,75 @@ def processar_aircraft_type(aty_value):
     aty_clean = re.sub(r'[^A-Z0-9]', '', aty_str)
     return aty_clean[:3] if aty_clean else "320"
 
-def converter_horario(time_value):
+# Horários como minutos desde 00:00 (0..1439); SEM_HORARIO = vazio ou inválido
+MINUTOS_DIA = 1440
+SEM_HORARIO = -1
+
+# Minuto do dia → 'HHMM'; a posição extra (índice SEM_HORARIO = -1) é o horário vazio (None)
+TABELA_HORARIOS = np.array([f"{minuto // 60:02d}{minuto % 60:02d}" for minuto in range(MINUTOS_DIA)] + [None],
+                           dtype=object)
+
+# Texto: %H:%M:%S, %H:%M e %H%M, nesta ordem, com as mesmas regras de dígitos do strptime
+_HORA = r'(2[0-3]|[0-1]\d|\d)'
+_MINUTO = r'([0-5]\d|\d)'
+_FORMATOS_HORARIO = (
+    re.compile(_HORA + ':' + _MINUTO + r':(6[0-1]|[0-5]\d|\d)'),
+    re.compile(_HORA + ':' + _MINUTO),
+    re.compile(_HORA + _MINUTO),
+)
+
+def _minutos_texto(texto):
+    for formato in _FORMATOS_HORARIO:
+        match = formato.match(texto)
+        # Como no strptime: nada pode sobrar no fim e segundos vão até 59
+        if match and match.end() == len(texto) and (match.lastindex < 3 or int(match.group(3)) < 60):
+            return int(match.group(1)) * 60 + int(match.group(2))
+    return SEM_HORARIO
+
+def minutos_do_dia(time_value):
+    """
+    Horário → minutos desde 00:00 (0..1439) ou SEM_HORARIO
+    Aceita time/datetime/Timestamp, texto HH:MM:SS, HH:MM ou HHMM, timedelta
+    menor que 24h e fração de dia do Excel (0 <= valor < 1). Segundos são descartados.
+    """
     if pd.isna(time_value):
-        return None
-    try:
-        if isinstance(time_value, str):
-            for fmt in ['%H:%M:%S', '%H:%M', '%H%M']:
-                try:
-                    return datetime.strptime(time_value.strip(), fmt).strftime('%H%M')
-                except:
-                    continue
-        elif hasattr(time_value, 'hour'):
-            return f"{time_value.hour:02d}{time_value.minute:02d}"
-        else:
-            time_str = str(time_value).strip()
-            if ':' in time_str:
-                parts = time_str.split(':')
-                hour, minute = int(parts[0]), int(parts[1]) if len(parts) > 1 else 0
-                return f"{hour:02d}{minute:02d}"
-    except:
-        pass
-    return None
+        return SEM_HORARIO
+    if isinstance(time_value, str):
+        return _minutos_texto(time_value.strip())
+    if hasattr(time_value, 'hour'):
+        return time_value.hour * 60 + time_value.minute
+    if isinstance(time_value, timedelta):
+        segundos = time_value.total_seconds()
+        return int(segundos // 60) if 0 <= segundos < MINUTOS_DIA * 60 else SEM_HORARIO
+    if isinstance(time_value, numbers.Real) and not isinstance(time_value, bool) and 0 <= time_value < 1:
+        return int(round(time_value * MINUTOS_DIA)) % MINUTOS_DIA
+    return SEM_HORARIO
+
+def converter_horario(time_value):
+    """Horário → 'HHMM' ou None (ver minutos_do_dia)"""
+    return TABELA_HORARIOS[minutos_do_dia(time_value)]
+
+def minutos_coluna(serie):
+    """
+    minutos_do_dia da coluna inteira (int16, SEM_HORARIO quando vazio/inválido)
+    Datas/horas e números (fração de dia) são convertidos de forma vetorizada;
+    as demais colunas pelos valores distintos
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        minutos = (serie.dt.hour * 60 + serie.dt.minute).to_numpy(dtype=float)
+        return np.where(np.isnan(minutos), SEM_HORARIO, minutos).astype(np.int16)
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        fracao = serie.to_numpy(dtype=float)
+        valido = (fracao >= 0) & (fracao < 1)
+        minutos = np.rint(np.where(valido, fracao, 0) * MINUTOS_DIA) % MINUTOS_DIA
+        return np.where(valido, minutos, SEM_HORARIO).astype(np.int16)
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    tabela = np.array([minutos_do_dia(valor) for valor in unicos] + [SEM_HORARIO], dtype=np.int16)
+    return tabela[codigos]
+
+def renderizar_horarios(minutos):
+    """Minutos (inteiro ou array) → 'HHMM' pela tabela de 1440 entradas (SEM_HORARIO → None)"""
+    return TABELA_HORARIOS[minutos]
 
 def gerar_dias_operacionais_ssim(row):
     """Gera dias com ESPAÇOS: '1  4 67' = dias 1,4,6,7"""
@@ -125,36 +211,8 @@ def construir_linha_ssim(airline, flight_num, itin_var, leg_seq, service_type,
                          arr_station, arr_time, arr_tz, aircraft_type, next_flight_info, line_num):
     """
     Constrói linha 3 do SSIM com EXATAMENTE 200 caracteres
-    Baseado no formato oficial EK
+    Baseado no formato oficial EK - posições em ssim_layout.LAYOUT_TIPO_3
     """
-    
-    # Pos 0-75: Dados básicos
-    linha = "3 "  # 0-2
-    linha += f"{airline:<2} "  # 2-5
-    linha += f"{flight_num}"  # 5-9
-    linha += f"{itin_var}"  # 9-11
-    linha += f"{leg_seq}"  # 11-13
-    linha += f"{service_type}"  # 13-14
-    linha += f"{period_from}"  # 14-21
-    linha += f"{period_to}"  # 21-28
-    linha += f"{days_of_op}"  # 28-35
-    linha += " "  # 35-36
-    linha += f"{dep_station:<3}"  # 36-39
-    linha += f"{dep_time}"  # 39-43
-    linha += f"{dep_time}"  # 43-47
-    linha += f"{dep_tz}"  # 47-52
-    linha += "  "  # 52-54
-    linha += f"{arr_station:<3}"  # 54-57
-    linha += f"{arr_time}"  # 57-61
-    linha += f"{arr_time}"  # 61-65
-    linha += f"{arr_tz}"  # 65-70
-    linha += "  "  # 70-72
-    linha += f"{aircraft_type:<3}"  # 72-75
-    
-    # Pos 75-128: Onward/Designator (53 espaços)
-    linha += " " * 53
-    
-    # Pos 128-144: Next Flight Data (16 caracteres)
     if next_flight_info:
         next_airline, next_flight_num = next_flight_info
     else:
@@ -162,227 +220,792 @@ def construir_linha_ssim(airline, flight_num, itin_var, leg_seq, service_type,
         next_airline = airline
         next_flight_num = flight_num
     
-    linha += f"{next_airline:<2}"  # 128-130
-    linha += " " * 7  # 130-137
-    linha += f"{next_airline:<2}"  # 137-139
-    linha += "  "  # 139-141
-    linha += f"{next_flight_num:>4}"  # 141-145 (4 dígitos, right-aligned)
-    
-    # Pos 145-192: Espaços (47 caracteres)
-    linha += " " * 47
+    return FORMATADOR_TIPO_3.formatar((
+        airline, flight_num, itin_var, leg_seq, service_type,
+        period_from, period_to, days_of_op,
+        dep_station, dep_time, dep_time, dep_tz,
+        arr_station, arr_time, arr_time, arr_tz,
+        aircraft_type, next_airline, next_airline, next_flight_num, line_num
+    ))
+
+def _coluna(df, nome):
+    """Retorna a coluna do DataFrame ou uma coluna vazia (NaN) se não existir"""
+    if nome in df.columns:
+        return df[nome]
+    return pd.Series(float('nan'), index=df.index, dtype=object)
+
+def _mapear_unicos(serie, funcao):
+    """
+    Aplica uma função escalar apenas aos valores distintos da coluna
+    e espalha o resultado de volta com indexação NumPy
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    # Último elemento = resultado para valores vazios (código -1)
+    resultados = [funcao(valor) for valor in unicos] + [funcao(float('nan'))]
+    tabela = np.empty(len(resultados), dtype=object)
+    tabela[:] = resultados
+    return tabela[codigos]
+
+def _texto(serie):
+    """Coluna como texto em maiúsculas e sem espaços nas pontas (NaN preservado)"""
+    return serie.astype(object).where(serie.notna()).astype(str).str.strip().str.upper()
+
+def _designadores(serie):
+    """
+    Extrai companhia e número do voo de uma coluna inteira (A.FLT ou D.FLT)
+    Números com mais de 4 dígitos não cabem no SSIM: o designador é descartado
+    (com aviso, uma vez por valor distinto) em vez de virar outro voo truncado
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    partes = [parse_designator(valor) for valor in unicos] + [(None, None, None)]
+    longos = [indice for indice, (_, numero, _) in enumerate(partes) if numero is not None and len(numero) > 4]
+    if longos:
+        logger.warning("⚠️ Voos com número de mais de 4 dígitos ignorados: %s",
+                       ', '.join(str(unicos[indice]) for indice in longos))
+        for indice in longos:
+            partes[indice] = (None, None, None)
+    tabela_airline = np.empty(len(partes), dtype=object)
+    tabela_numero = np.empty(len(partes), dtype=object)
+    tabela_airline[:] = [airline for airline, _, _ in partes]
+    tabela_numero[:] = [numero for _, numero, _ in partes]
+
+    numero = tabela_numero[codigos]
+    return pd.notna(numero), tabela_airline[codigos], numero
+
+def _estacao(serie):
+    """ORIG/DEST: 3 primeiras letras em maiúsculas, 'XXX' se vazio"""
+    texto = serie.astype(object).where(serie.notna()).astype(str).str[:3].str.upper()
+    return np.where(serie.notna().to_numpy(), texto.to_numpy(dtype=object), 'XXX')
+
+def _aircraft(serie):
+    """Versão vetorizada de processar_aircraft_type (aplicada aos valores distintos)"""
+    return _mapear_unicos(serie, processar_aircraft_type)
+
+def _flt_types(serie):
+    """Versão vetorizada de processar_flt_type → (arrive_type, depart_type)"""
+    tipos = _mapear_unicos(serie, processar_flt_type)
+    arrive = np.array([tipo[0] for tipo in tipos], dtype=object)
+    depart = np.array([tipo[1] for tipo in tipos], dtype=object)
+    return arrive, depart
+
+# Dias operacionais como máscara uint8: bit 0 = segunda (OP.D.1) ... bit 6 = domingo (OP/D/7)
+TODOS_OS_DIAS = 0x7F
+
+# Máscara → texto SSIM ('1  4 67'); máscara vazia = todos os dias, como em gerar_dias_operacionais_ssim
+TABELA_DIAS = np.array(
+    [''.join(str(i + 1) if mascara >> i & 1 else ' ' for i in range(7)) if mascara else '1234567'
+     for mascara in range(TODOS_OS_DIAS + 1)], dtype=object)
+
+def mascara_dias(df):
+    """Máscara de dias operacionais da malha inteira (uint8, vazia → todos os dias)"""
+    mascara = np.zeros(len(df), dtype=np.uint8)
+    for bit, col_name in enumerate(COLUNAS_DIAS):
+        serie = _coluna(df, col_name)
+        marcado = (serie.notna() & (_texto(serie) != "")).to_numpy(dtype=bool)
+        mascara |= marcado.astype(np.uint8) << bit
+    mascara[mascara == 0] = TODOS_OS_DIAS
+    return mascara
+
+def deslocar_dias(mascara, dias=1):
+    """Máscara deslocada N dias (ex.: +1 para pernoite; domingo volta para segunda)"""
+    dias %= 7
+    return ((mascara << dias) | (mascara >> (7 - dias))) & TODOS_OS_DIAS
+
+def intersecao_dias(mascara_a, mascara_b):
+    """Dias em comum entre duas máscaras (0 = nenhum)"""
+    return mascara_a & mascara_b
+
+def opera_entre(mascara, inicio, fim):
+    """Algum dia de [inicio, fim] (dias desde 1970-01-01, uma quinta-feira) está na máscara?"""
+    return any(mascara >> ((dia + 3) % 7) & 1 for dia in range(inicio, min(fim, inicio + 6) + 1))
+
+def renderizar_dias(mascara):
+    """Máscara (inteiro ou array) → texto SSIM pela tabela de 128 entradas"""
+    return TABELA_DIAS[mascara]
+
+# Datas do período como datetime64[D]; NaT = vazio (usa o período padrão)
+_DATA_INVALIDA = object()
+
+def _data_dia(valor):
+    """Mesma leitura de processar_periodo para uma data: datetime64[D], NaT se vazia ou _DATA_INVALIDA"""
+    if pd.isna(valor):
+        return np.datetime64('NaT', 'D')
+    try:
+        if isinstance(valor, str):
+            valor = pd.to_datetime(valor)
+        return np.datetime64(f"{valor.year:04d}-{valor.month:02d}-{valor.day:02d}", 'D')
+    except:
+        return _DATA_INVALIDA
+
+def datas_coluna(serie):
+    """
+    Coluna FROM/TILL → (datas datetime64[D] com NaT nos vazios, máscara de datas inválidas)
+    Colunas de data são convertidas de uma vez; as demais pelos valores distintos
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        if getattr(serie.dt, 'tz', None) is not None:
+            serie = serie.dt.tz_localize(None)
+        return serie.to_numpy().astype('datetime64[D]'), np.zeros(len(serie), dtype=bool)
+
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    lidas = [_data_dia(valor) for valor in unicos]
+    invalidas = np.array([data is _DATA_INVALIDA for data in lidas] + [False], dtype=bool)
+    tabela = np.array([np.datetime64('NaT', 'D') if data is _DATA_INVALIDA else data for data in lidas] +
+                      [np.datetime64('NaT', 'D')], dtype='datetime64[D]')
+    return tabela[codigos], invalidas[codigos]
+
+@functools.lru_cache(maxsize=None)
+def _texto_data_ssim(dia):
+    """Dias desde 1970-01-01 → 'DDMMMYY' (memorizado: uma temporada tem poucas centenas de datas)"""
+    return (datetime(1970, 1, 1) + timedelta(days=dia)).strftime('%d%b%y').upper()
+
+def renderizar_datas(datas):
+    """Array datetime64[D] → 'DDMMMYY', uma formatação por data distinta"""
+    codigos, unicos = pd.factorize(datas.astype(np.int64))
+    tabela = np.array([_texto_data_ssim(dia) for dia in unicos.tolist()], dtype=object)
+    return tabela[codigos]
+
+def _periodos(df):
+    """
+    Versão vetorizada de processar_periodo → (data_from, data_till) em datetime64[D]
+    Vazio → hoje / hoje + 365 dias; data inválida em FROM ou TILL → período padrão inteiro
+    """
+    agora = datetime.now()
+    padrao_from = np.datetime64(agora.date(), 'D')
+    padrao_till = np.datetime64((agora + timedelta(days=365)).date(), 'D')
+
+    data_from, from_invalida = datas_coluna(_coluna(df, 'FROM'))
+    data_till, till_invalida = datas_coluna(_coluna(df, 'TILL'))
+    data_from = np.where(np.isnat(data_from), padrao_from, data_from)
+    data_till = np.where(np.isnat(data_till), padrao_till, data_till)
+
+    erro = from_invalida | till_invalida
+    return np.where(erro, padrao_from, data_from), np.where(erro, padrao_till, data_till)
+
+def parear_night_stops(df_norm):
+    """
+    Next Flight das chegadas em night stop (DEST = N/S) sem D.FLT da mesma companhia na linha
+    As saídas após pernoite (ORIG = N/S) são indexadas por (companhia, voo de chegada
+    informado na linha) em um dicionário; cada chegada consulta só a sua chave e
+    escolhe a primeira saída (ordem da malha) que opera no dia seguinte (máscara de
+    dias deslocada +1) dentro do período deslocado +1 dia.
+    Saídas após pernoite sem voo de chegada na linha (A.FLT vazio ou 'N/S') ficam em um
+    segundo índice só por companhia, consultado quando a chave da chegada não dá par;
+    cada uma delas é usada por uma única chegada. Sem par: o próprio voo.
+    """
+    proximo_voo = df_norm['proximo_voo'].to_numpy(dtype=object).copy()
+    airline_a = df_norm['airline_a'].to_numpy(dtype=object)
+    numero_a = df_norm['numero_a'].to_numpy(dtype=object)
+    airline_d = df_norm['airline_d'].to_numpy(dtype=object)
+    numero_d = df_norm['numero_d'].to_numpy(dtype=object)
+
+    mesmo_airline = pd.notna(airline_d) & (airline_d == airline_a)
+    pendentes = np.flatnonzero(df_norm['chegada'].to_numpy(dtype=bool) &
+                               (df_norm['dest'].to_numpy(dtype=object) == 'N/S') & ~mesmo_airline)
+    apos_pernoite = df_norm['saida'].to_numpy(dtype=bool) & (df_norm['orig'].to_numpy(dtype=object) == 'N/S')
+    saidas = np.flatnonzero(apos_pernoite & mesmo_airline)
+    sem_chegada = np.flatnonzero(apos_pernoite & pd.isna(airline_a))
+    if len(pendentes) == 0 or len(saidas) + len(sem_chegada) == 0:
+        return proximo_voo
+
+    dias = df_norm['dias_bits'].to_numpy()
+    dias_seguintes = deslocar_dias(dias).tolist()
+    dias = dias.tolist()
+    inicio = df_norm['data_from'].to_numpy().astype('datetime64[D]').astype(np.int64).tolist()
+    fim = df_norm['data_till'].to_numpy().astype('datetime64[D]').astype(np.int64).tolist()
+
+    # Índice: (companhia, voo de chegada) → saídas candidatas, na ordem da malha
+    indice = {}
+    for pos in saidas.tolist():
+        indice.setdefault((airline_d[pos], numero_a[pos]), []).append(pos)
+    # Saídas sem voo de chegada: companhia → saídas candidatas, na ordem da malha
+    indice_companhia = {}
+    for pos in sem_chegada.tolist():
+        indice_companhia.setdefault(airline_d[pos], []).append(pos)
+    usadas = set()
+
+    def primeira_saida(pos, candidatos):
+        inicio_seguinte, fim_seguinte = inicio[pos] + 1, fim[pos] + 1
+        for candidato in candidatos:
+            if (candidato not in usadas and intersecao_dias(dias[candidato], dias_seguintes[pos]) and
+                    inicio[candidato] <= fim_seguinte and fim[candidato] >= inicio_seguinte):
+                return candidato
+        return None
+
+    for pos in pendentes.tolist():
+        candidato = primeira_saida(pos, indice.get((airline_a[pos], numero_a[pos]), ()))
+        if candidato is None:
+            candidato = primeira_saida(pos, indice_companhia.get(airline_a[pos], ()))
+            if candidato is None:
+                continue
+            usadas.add(candidato)
+        proximo_voo[pos] = numero_d[candidato]
+
+    return proximo_voo
+
+# Estação da malha: todas as pernas chegam ou partem daqui
+ESTACAO_BASE = 'AMS'
+
+def verificar_fuso_base():
+    """Sem o fuso de ESTACAO_BASE todas as pernas sairiam com +0000: falha em vez de gerar"""
+    if fuso_estacao(ESTACAO_BASE) is None:
+        raise RuntimeError(f"Fuso horário de {ESTACAO_BASE} indisponível: instale o pacote tzdata "
+                           f"(pip install -r requirements.txt)")
+
+@functools.lru_cache(maxsize=65536)
+def _segmentos_utc(dep_station, arr_station, inicio, fim):
+    """
+    Trechos de uma perna por par de estações e período: ((inicio, fim), ...) e
+    ((period_from, period_to, variação UTC partida, variação UTC chegada, diferença), ...)
+    O período é dividido nas mudanças de horário das duas estações (station_timezones);
+    diferença = deslocamento da chegada - deslocamento da partida, em minutos (sem fuso = UTC)
+    """
+    segmentos = segmentos_periodo((dep_station, arr_station), inicio, fim)
+    dias = tuple((de, ate) for de, ate, _ in segmentos)
+    trechos = tuple((_texto_data_ssim(de), _texto_data_ssim(ate), formatar_variacao(partida),
+                     formatar_variacao(chegada), (chegada or 0) - (partida or 0))
+                    for de, ate, (partida, chegada) in segmentos)
+    return dias, trechos
+
+def _trechos_operantes(dias, trechos, mascara):
+    """Só os trechos com algum dia de operação (todos, se nenhum tiver)"""
+    return tuple(trecho for (de, ate), trecho in zip(dias, trechos) if opera_entre(mascara, de, ate)) or trechos
+
+# Tempo de bloco estimado (não temos o horário remoto real): a partida remota é 2h antes
+# da chegada em AMS e a chegada remota 2h depois da saída, contadas em UTC e convertidas
+# para a hora local da estação remota com a variação do trecho
+DESLOCAMENTO_REMOTO = 120
+
+def normalizar_schedule(df):
+    """
+    Normaliza TODAS as linhas da malha de uma vez (operações colunares)
+    Retorna um DataFrame com os campos já no formato SSIM, na mesma ordem de df
+    """
+    a_valido, airline_a, numero_a = _designadores(_coluna(df, 'A.FLT'))
+    d_valido, airline_d, numero_d = _designadores(_coluna(df, 'D.FLT'))
+
+    sta_min = minutos_coluna(_coluna(df, 'STA'))
+    std_min = minutos_coluna(_coluna(df, 'STD'))
+    orig = _estacao(_coluna(df, 'ORIG'))
+    dest = _estacao(_coluna(df, 'DEST'))
+    arrive_type, depart_type = _flt_types(_coluna(df, 'FLT.TYPE'))
+    data_from, data_till = _periodos(df)
+    dias_bits = mascara_dias(df)
+
+    # Chegada (ORIG → AMS) e saída (AMS → DEST) válidas, independente da companhia
+    chegada = a_valido & (orig != 'N/S') & (sta_min != SEM_HORARIO)
+    saida = d_valido & (dest != 'N/S') & (std_min != SEM_HORARIO)
+
+    # Next Flight da chegada: D.FLT da mesma linha se for da mesma companhia, senão o próprio voo
+    # (chegadas em night stop sem D.FLT são completadas por parear_night_stops)
+    mesmo_airline = d_valido & (airline_d == airline_a)
+    proximo_voo = np.where(mesmo_airline, numero_d, numero_a)
+
+    df_norm = pd.DataFrame({
+        'airline_a': airline_a,
+        'numero_a': numero_a,
+        'airline_d': airline_d,
+        'numero_d': numero_d,
+        'chegada': chegada,
+        'saida': saida,
+        'proximo_voo': proximo_voo,
+        'sta': renderizar_horarios(sta_min),
+        'std': renderizar_horarios(std_min),
+        'sta_min': sta_min,
+        'std_min': std_min,
+        'orig': orig,
+        'dest': dest,
+        'aircraft': _aircraft(_coluna(df, 'ATY')),
+        'arrive_type': arrive_type,
+        'depart_type': depart_type,
+        'data_from': data_from,
+        'data_till': data_till,
+        'period_from': renderizar_datas(data_from),
+        'period_to': renderizar_datas(data_till),
+        'dias_bits': dias_bits,
+        'days_of_op': renderizar_dias(dias_bits),
+    })
+
+    # Night stops: chegada N/S ligada à saída do dia seguinte (linha ORIG = N/S)
+    df_norm['proximo_voo'] = parear_night_stops(df_norm)
+
+    sem_fuso = sorted(estacao for estacao in pd.unique(np.concatenate([orig, dest]))
+                      if estacao not in ('N/S', 'XXX') and fuso_estacao(estacao) is None)
+    if sem_fuso:
+        logger.warning("🕒 Estações sem fuso conhecido (UTC +0000): %s", ', '.join(sem_fuso))
+    return df_norm
+
+def particionar_por_companhia(df_norm):
+    """
+    Mapa companhia → posições das linhas (ordem original) em UMA passada
+    Uma linha entra na companhia da chegada e/ou na companhia da saída
+    """
+    posicoes = np.arange(len(df_norm))
+    cias = np.concatenate([df_norm['airline_a'].to_numpy(dtype=object),
+                           df_norm['airline_d'].to_numpy(dtype=object)])
+    posicoes = np.concatenate([posicoes, posicoes])
+    valido = pd.notna(cias)
+    cias, posicoes = cias[valido], posicoes[valido]
+
+    grupos = pd.Series(posicoes).groupby(cias, sort=True).indices
+    return {cia: np.unique(posicoes[idx]) for cia, idx in grupos.items()}
+
+# Colunas da malha normalizada percorridas no laço dos registros tipo 3
+COLUNAS_LACO = (
+    'airline_a', 'numero_a', 'airline_d', 'numero_d', 'chegada', 'saida', 'proximo_voo',
+    'sta', 'std', 'sta_min', 'std_min', 'orig', 'dest', 'aircraft',
+    'arrive_type', 'depart_type', 'days_of_op')
+
+# Colunas que definem os registros (e a impressão digital incremental): laço + período e dias dos trechos UTC
+COLUNAS_REGISTRO = COLUNAS_LACO + ('data_from', 'data_till', 'dias_bits')
+
+def _dias_desde_1970(serie):
+    return serie.to_numpy().astype('datetime64[D]').astype(np.int64)
+
+def _trechos_linhas(estacao, outra_estacao, data_from, data_till, dias_bits, partida_remota):
+    """
+    Trechos UTC de cada linha (lista), calculados uma vez por combinação distinta de
+    (estação, período): as colunas são combinadas numa chave inteira e fatoradas.
+    Os dias de operação só entram nas linhas cujo período foi dividido: trechos
+    sem nenhum dia de operação ficam de fora (_trechos_operantes).
+    partida_remota: True = estacao → outra_estacao (chegada em AMS), False = o inverso
+    """
+    if len(estacao) == 0:
+        return []
+    codigos_estacao, estacoes = pd.factorize(estacao, use_na_sentinel=False)
+    base = min(data_from.min(), data_till.min())
+    chave = (codigos_estacao.astype(np.int64) << 20 | (data_from - base)) << 20 | (data_till - base)
+    codigos, unicos = pd.factorize(chave)
+    # Primeira linha de cada combinação (atribuição de trás para frente: a primeira escrita vence)
+    primeira = np.empty(len(unicos), dtype=np.intp)
+    primeira[codigos[::-1]] = np.arange(len(codigos))[::-1]
+
+    combinacoes = []
+    for pos in primeira.tolist():
+        remota = estacoes[codigos_estacao[pos]]
+        pares = (remota, outra_estacao) if partida_remota else (outra_estacao, remota)
+        combinacoes.append(_segmentos_utc(*pares, int(data_from[pos]), int(data_till[pos])))
+    trechos = np.empty(len(unicos), dtype=object)
+    trechos[:] = [trechos_combinacao for _, trechos_combinacao in combinacoes]
+    por_linha = trechos[codigos].tolist()
+
+    # Períodos divididos: trechos sem nenhum dia de operação da linha ficam de fora
+    divididos = np.array([len(trechos_combinacao) > 1 for _, trechos_combinacao in combinacoes], dtype=bool)
+    for pos in np.flatnonzero(divididos[codigos]).tolist():
+        por_linha[pos] = _trechos_operantes(*combinacoes[codigos[pos]], int(dias_bits[pos]))
+    return por_linha
+
+def gerar_registros_companhia(df_norm, companhia, flight_counter, numero_linha, particao=None, ao_avancar=None):
+    """
+    Gera as linhas tipo 3 de uma companhia a partir da malha normalizada
+    Percorre arrays já prontos (sem iterrows nem conversões por linha)
+    ao_avancar(linhas_processadas) é chamado a cada PROGRESS_EVERY linhas da malha e no fim
+    """
+    verificar_fuso_base()
+    if particao is None:
+        particao = particionar_por_companhia(df_norm)
+    selecao = df_norm.iloc[particao.get(companhia, np.empty(0, dtype=np.intp))]
+
+    linhas = []
+    colunas = [selecao[c].tolist() for c in COLUNAS_LACO]
+
+    # Trechos (período + variações UTC) de cada perna, por combinação distinta de estação/período/dias
+    data_from, data_till = _dias_desde_1970(selecao['data_from']), _dias_desde_1970(selecao['data_till'])
+    dias_bits = selecao['dias_bits'].to_numpy()
+    trechos_chegada = _trechos_linhas(selecao['orig'].to_numpy(dtype=object), ESTACAO_BASE,
+                                      data_from, data_till, dias_bits, True)
+    trechos_saida = _trechos_linhas(selecao['dest'].to_numpy(dtype=object), ESTACAO_BASE,
+                                    data_from, data_till, dias_bits, False)
+    registros = zip(*colunas, trechos_chegada, trechos_saida)
+    passo = PROGRESS_EVERY if ao_avancar is not None else max(len(selecao), 1)
+
+    # Blocos de `passo` linhas: o progresso não custa nada dentro do laço
+    for processadas in range(0, len(selecao), passo):
+        for (airline_a, flight_num_a, airline_d, flight_num_d, chegada, saida, proximo_voo,
+             sta, std, sta_min, std_min, orig, dest, aircraft,
+             arrive_type, depart_type, days_of_op, trechos_a, trechos_d) in itertools.islice(registros, passo):
+
+            # VOO DE CHEGADA (ORIG → AMS) - um registro por trecho sem mudança de horário
+            if chegada and airline_a == companhia:
+                key_a = f"{companhia}_{flight_num_a}_ARR"
+                for from_date, till_date, utc_origem, utc_base, diferenca in trechos_a:
+                    flight_counter[key_a] = flight_counter.get(key_a, 0) + 1
+                    itin_var = f"{flight_counter[key_a]:02d}"
+                    # Partida remota: chegada em AMS - bloco (em UTC), na hora local da origem
+                    std_origem = TABELA_HORARIOS[(sta_min - DESLOCAMENTO_REMOTO - diferenca) % MINUTOS_DIA]
+
+                    linhas.append(construir_linha_ssim(
+                        companhia, flight_num_a, itin_var, "01", arrive_type,
+                        from_date, till_date, days_of_op,
+                        orig, std_origem, utc_origem,  # Horário de origem é calculado (não temos real)
+                        ESTACAO_BASE, sta, utc_base,  # Horário de AMS é REAL da malha
+                        aircraft, (companhia, proximo_voo), numero_linha
+                    ))
+                    numero_linha += 1
+
+            # VOO DE SAÍDA (AMS → DEST)
+            if saida and airline_d == companhia:
+                key_d = f"{companhia}_{flight_num_d}_DEP"
+                for from_date, till_date, utc_base, utc_destino, diferenca in trechos_d:
+                    flight_counter[key_d] = flight_counter.get(key_d, 0) + 1
+                    itin_var = f"{flight_counter[key_d]:02d}"
+                    # Chegada remota: saída de AMS + bloco (em UTC), na hora local do destino
+                    sta_destino = TABELA_HORARIOS[(std_min + DESLOCAMENTO_REMOTO + diferenca) % MINUTOS_DIA]
+
+                    # Departure repete própria informação
+                    linhas.append(construir_linha_ssim(
+                        companhia, flight_num_d, itin_var, "01", depart_type,
+                        from_date, till_date, days_of_op,
+                        ESTACAO_BASE, std, utc_base,  # Horário de AMS é REAL da malha
+                        dest, sta_destino, utc_destino,  # Horário de destino é calculado (não temos real)
+                        aircraft, (companhia, flight_num_d), numero_linha
+                    ))
+                    numero_linha += 1
+
+        if ao_avancar is not None:
+            ao_avancar(min(processadas + passo, len(selecao)))
+
+    return linhas
+
+def ler_schedule(fonte):
+    """
+    Malha a partir de um DataFrame já carregado (usado sem cópia nem releitura)
+    ou de um caminho / objeto arquivo Excel (só as colunas usadas, ver schedule_loader)
+    """
+    if isinstance(fonte, pd.DataFrame):
+        return fonte
+    return carregar_schedule(fonte)
+
+class SchedulePreparado(NamedTuple):
+    """
+    Malha original + malha normalizada + partição por companhia, pronta para gerar SSIM
+    df é None quando a malha normalizada veio do cache em disco (Excel não lido)
+    """
+    df: pd.DataFrame
+    normalizado: pd.DataFrame
+    particao: dict
+
+    @property
+    def companhias(self):
+        return sorted(self.particao)
+
+def _avisar_progresso(progress_callback, etapa, feitos, total):
+    if progress_callback is not None:
+        progress_callback(etapa, feitos, total)
+
+def preparar_schedule(fonte, cache_dir=None, profiler=None, progress_callback=None):
+    """
+    Lê (se preciso), normaliza e particiona a malha uma única vez
+    Aceita caminho, objeto arquivo, DataFrame ou um SchedulePreparado (devolvido como está)
+    cache_dir: com um caminho de arquivo, reaproveita a malha normalizada gravada
+               em disco (chave = hash do arquivo + versão, ver schedule_cache)
+    profiler: ProfilerPipeline opcional (etapas cache, load, normalize, partition)
+    progress_callback(etapa, 1, 1) ao concluir cada etapa (cache quando a malha vem do cache)
+    """
+    if isinstance(fonte, SchedulePreparado):
+        return fonte
+
+    chave, df, df_norm = None, None, None
+    if cache_dir is not None and isinstance(fonte, (str, os.PathLike)):
+        with medir(profiler, 'cache'):
+            chave = chave_cache(fonte)
+            df_norm = ler_cache(cache_dir, chave)
+        if df_norm is not None:
+            logger.debug("Malha normalizada do cache: %s", chave)
+            _avisar_progresso(progress_callback, 'cache', 1, 1)
+
+    if df_norm is None:
+        with medir(profiler, 'load'):
+            df = ler_schedule(fonte)
+        _avisar_progresso(progress_callback, 'load', 1, 1)
+        with medir(profiler, 'normalize'):
+            df_norm = normalizar_schedule(df)
+        _avisar_progresso(progress_callback, 'normalize', 1, 1)
+        if chave is not None:
+            with medir(profiler, 'cache'):
+                try:
+                    gravar_cache(cache_dir, chave, df_norm)
+                except Exception:
+                    # Cache é opcional: falha ao gravar não interrompe a conversão
+                    logger.warning("⚠️ Não foi possível gravar o cache em %s", cache_dir, exc_info=True)
+
+    with medir(profiler, 'partition'):
+        particao = particionar_por_companhia(df_norm)
+    _avisar_progresso(progress_callback, 'partition', 1, 1)
+    if profiler is not None:
+        profiler.contar('linhas', len(df_norm))
+    return SchedulePreparado(df, df_norm, particao)
+
+def _registros_companhia_processo(tarefa):
+    """Worker do ProcessPoolExecutor: linhas tipo 3 de UMA companhia, numeradas a partir de 1"""
+    df_companhia, companhia = tarefa
+    particao = {companhia: np.arange(len(df_companhia))}
+    return gerar_registros_companhia(df_companhia, companhia, {}, 1, particao)
+
+def _blocos_companhias(df_norm, particao, companias_list, numero_linha, workers=None, estado=None, profiler=None,
+                       progress_callback=None):
+    """
+    Linhas tipo 3 de cada companhia, na ordem de companias_list, numeradas a partir de numero_linha
+    workers > 1: cada companhia vai para um processo e os seriais são refeitos aqui, na ordem
+    estado (EstadoIncremental): companhias sem alteração reaproveitam o bloco da última conversão
+    profiler: tempo de geração acumulado na etapa 'build' e contador 'voos'
+    progress_callback('build', linhas, total): linhas da malha já processadas (a cada
+    PROGRESS_EVERY linhas no caminho serial; por companhia com workers ou estado)
+    """
+    vazio = np.empty(0, dtype=np.intp)
+    total = sum(len(particao.get(companhia, vazio)) for companhia in companias_list)
+    feitos = 0
+
+    if estado is None and (not workers or workers <= 1 or len(companias_list) <= 1):
+        flight_counter = {}
+        for companhia in companias_list:
+            ao_avancar = None
+            if progress_callback is not None:
+                def ao_avancar(linhas, base=feitos):
+                    progress_callback('build', base + linhas, total)
+            with medir(profiler, 'build'):
+                linhas = gerar_registros_companhia(df_norm, companhia, flight_counter, numero_linha, particao,
+                                                   ao_avancar)
+            numero_linha += len(linhas)
+            feitos += len(particao.get(companhia, vazio))
+            if profiler is not None:
+                profiler.contar('voos', len(linhas))
+            yield companhia, linhas
+        return
+
+    def fatia(companhia):
+        return df_norm.iloc[particao.get(companhia, vazio)]
+
+    # Blocos prontos (numerados a partir de 1): do estado incremental ou já gerados nesta passada
+    prontos, impressoes = {}, {}
+    if estado is not None:
+        for companhia in dict.fromkeys(companias_list):
+            impressoes[companhia] = impressao_digital(fatia(companhia)[list(COLUNAS_REGISTRO)], companhia)
+            bloco = estado.bloco(companhia, impressoes[companhia])
+            if bloco is not None:
+                prontos[companhia] = bloco
+    pendentes = [companhia for companhia in dict.fromkeys(companias_list) if companhia not in prontos]
+    tarefas = ((fatia(companhia), companhia) for companhia in pendentes)
+
+    with contextlib.ExitStack() as pilha:
+        if workers and workers > 1 and len(pendentes) > 1:
+            executor = pilha.enter_context(ProcessPoolExecutor(max_workers=workers))
+            # map devolve os resultados na ordem das companhias, conforme ficam prontos
+            novos = executor.map(_registros_companhia_processo, tarefas)
+        else:
+            novos = map(_registros_companhia_processo, tarefas)
+
+        for companhia in companias_list:
+            with medir(profiler, 'build'):
+                if companhia not in prontos:
+                    prontos[companhia] = next(novos)
+                    if estado is not None:
+                        estado.guardar(companhia, impressoes[companhia], prontos[companhia])
+                linhas = renumerar_registros(prontos[companhia], numero_linha)
+            numero_linha += len(linhas)
+            feitos += len(particao.get(companhia, vazio))
+            _avisar_progresso(progress_callback, 'build', feitos, total)
+            if profiler is not None:
+                profiler.contar('voos', len(linhas))
+            yield companhia, linhas
+
+def _iter_registros(df_norm, particao, companias_list, data_emissao=None, on_carrier=None, workers=None,
+                    estado=None, profiler=None, progress_callback=None):
+    """Gera todos os registros do arquivo (1, zeros, 2U, zeros, 3..., zeros, 5) em ordem"""
+    if data_emissao is None:
+        data_emissao = datetime.now().strftime('%d%b%y').upper()
     
-    # Pos 192-200: Line Number (8 caracteres)
-    linha += f"{line_num:08d}"
+    # HEADER + Carrier Info ÚNICA para TODAS as companhias
+    carrier_code = companias_list[0] if len(companias_list) == 1 else "XX"
+    registros = registros_header(carrier_code, data_emissao)
+    numero_linha = 1 + len(registros)
+    yield from registros
     
-    # Verificar comprimento
-    if len(linha) != 200:
-        print(f"⚠️ ERRO: Linha tem {len(linha)} caracteres, esperado 200!")
-        linha = linha[:200].ljust(200)
+    # PROCESSAR CADA COMPANHIA (SEM repetir 2U)
+    for companhia, linhas in _blocos_companhias(df_norm, particao, companias_list, numero_linha, workers, estado,
+                                                profiler, progress_callback):
+        numero_linha += len(linhas)
+        if on_carrier is not None:
+            on_carrier(companhia, len(linhas))
+        yield from linhas
     
-    return linha
+    # FOOTER ÚNICO
+    label = 'MULTI' if len(companias_list) > 1 else companias_list[0]
+    yield from registros_footer(label, data_emissao, numero_linha)
+
+def iter_ssim_records(df, carriers=None, data_emissao=None, workers=None, on_carrier=None, state_dir=None,
+                      progress_callback=None, state_namespace=None):
+    """
+    Gera os registros SSIM (200 caracteres, sem quebra de linha) um a um
+    Tipos 1, 2, 3, 5 e linhas de zeros, já numerados - nada é escrito em disco
+    carriers=None → todas as companhias da malha
+    workers=N → companhias processadas em N processos (mesma saída)
+    on_carrier(companhia, voos) é chamado após cada companhia
+    state_dir → modo incremental: só companhias alteradas são geradas de novo (ver ssim_incremental)
+    state_namespace → subdiretório do estado em state_dir (padrão: nome do arquivo de df, se for caminho)
+    progress_callback(etapa, feitos, total) → progresso das etapas (ver gerar_ssim_completo)
+    """
+    preparado = preparar_schedule(df, progress_callback=progress_callback)
+    if carriers is None:
+        carriers = preparado.companhias
+    if state_namespace is None:
+        state_namespace = nome_origem(df)
+    estado = EstadoIncremental(state_dir, state_namespace) if state_dir is not None else None
+    yield from _iter_registros(preparado.normalizado, preparado.particao, list(carriers), data_emissao,
+                               on_carrier=on_carrier, workers=workers, estado=estado,
+                               progress_callback=progress_callback)
+
+def nome_arquivo_saida(companias_list):
+    """Nome padrão do arquivo: <CIA>_<AAAAMMDD>_AMS.ssim ou MULTI_<AAAAMMDD>_AMS.ssim"""
+    data_atual = datetime.now()
+    if len(companias_list) == 1:
+        return f"{companias_list[0]}_{data_atual.strftime('%Y%m%d')}_AMS.ssim"
+    return f"MULTI_{data_atual.strftime('%Y%m%d')}_AMS.ssim"
 
-def gerar_ssim_completo(excel_path, companias_list=None, output_file=None):
+def _escrever_por_companhia(df_norm, particao, companias_list, destino, data_emissao=None,
+                            on_carrier=None, workers=None, estado=None, profiler=None, progress_callback=None):
+    """
+    Um arquivo SSIM por companhia em uma única passada pela malha normalizada
+    Cada arquivo tem header/2U/footer da própria companhia e seriais a partir de 1
+    (igual a gerar_ssim_w25_single_airline). destino: diretório, caminho .zip ou
+    objeto arquivo (recebe o zip). Retorna os caminhos gerados (ou o próprio zip)
+    """
+    if data_emissao is None:
+        data_emissao = datetime.now().strftime('%d%b%y').upper()
+
+    compactar = not isinstance(destino, (str, os.PathLike)) or os.fspath(destino).endswith('.zip')
+    if compactar:
+        pacote = zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED)
+    else:
+        os.makedirs(destino, exist_ok=True)
+
+    gerados = []
+    try:
+        for companhia, linhas in _blocos_companhias(df_norm, particao, companias_list, 1, workers, estado, profiler,
+                                                    progress_callback):
+            nome = nome_arquivo_saida([companhia])
+            sink = pacote.open(nome, 'w') if compactar else os.path.join(destino, nome)
+            with SSIMWriter(sink) as writer:
+                writer.write_header(companhia, data_emissao)
+                writer.write_records(renumerar_registros(linhas, writer.numero_linha))
+                writer.write_footer(companhia, data_emissao)
+            if compactar:
+                sink.close()
+            gerados.append(nome if compactar else sink)
+            _avisar_progresso(progress_callback, 'write', len(gerados), len(companias_list))
+            if on_carrier is not None:
+                on_carrier(companhia, len(linhas))
+    finally:
+        if compactar:
+            pacote.close()
+
+    return destino if compactar else gerados
+
+def gerar_ssim_completo(excel_path, companias_list=None, output_file=None, cache_dir=None, workers=None,
+                        split_by_carrier=False, state_dir=None, profiler=None, progress_callback=None):
     """
     Gera arquivo SSIM completo - VERSÃO FINAL
+    excel_path: caminho do Excel, objeto arquivo (upload), DataFrame já carregado
+                ou SchedulePreparado (malha já normalizada, ex.: cache do app)
+    cache_dir: diretório do cache em disco da malha normalizada (opcional)
+    workers: número de processos para gerar as companhias em paralelo (saída idêntica)
+    split_by_carrier: um arquivo por companhia; output_file vira o diretório de saída
+                      (padrão: atual) ou um .zip / objeto arquivo com todos os arquivos
+    state_dir: modo incremental - blocos por companhia da última conversão; só as
+               companhias cujas linhas normalizadas mudaram são geradas de novo
+               (estado separado por malha: subdiretório com o nome do arquivo de origem)
+    profiler: ProfilerPipeline opcional - tempos/memória por etapa em profiler.relatorio()
+    progress_callback(etapa, feitos, total): progresso legível por máquina
+        cache / load / normalize / partition → (1, 1) ao concluir
+        build → linhas da malha processadas, a cada PROGRESS_EVERY linhas
+        write → registros gravados no fim (split_by_carrier: arquivos gravados)
+    Mensagens vão para o logger do módulo (INFO; erros em ERROR) - sem configuração
+    de logging a conversão é silenciosa
     """
     try:
-        print("🔄 GERANDO SSIM - VERSÃO FINAL")
-        print("=" * 80)
+        with medir_execucao(profiler):
+            logger.info("🔄 GERANDO SSIM - VERSÃO FINAL")
         
-        df = pd.read_excel(excel_path)
-        print(f"✅ Arquivo lido: {len(df)} linhas")
+            # Ler, normalizar toda a malha de uma vez e particionar por companhia
+            preparado = preparar_schedule(excel_path, cache_dir, profiler, progress_callback)
+            df_norm, particao = preparado.normalizado, preparado.particao
+            if preparado.df is None:
+                logger.info("✅ Malha do cache: %d linhas", len(df_norm))
+            else:
+                logger.info("✅ Arquivo lido: %d linhas", len(df_norm))
         
-        # Determinar companhias
-        if companias_list is None:
-            companias = set()
-            for col in ['A.FLT', 'D.FLT']:
-                if col in df.columns:
-                    for flight in df[col].dropna():
-                        if flight != 'N/S':
-                            airline = extrair_airline(flight)
-                            if airline:
-                                companias.add(airline)
-            companias_list = sorted(list(companias))
+            # Determinar companhias
+            if companias_list is None:
+                companias_list = preparado.companhias
         
-        print(f"🏢 Companhias: {', '.join(companias_list)}")
+            logger.info("🏢 Companhias: %s", ', '.join(companias_list))
         
-        if output_file is None:
-            data_atual = datetime.now()
-            if len(companias_list) == 1:
-                output_file = f"{companias_list[0]}_{data_atual.strftime('%Y%m%d')}_AMS.ssim"
-            else:
-                output_file = f"MULTI_{data_atual.strftime('%Y%m%d')}_AMS.ssim"
+            def ao_processar_companhia(companhia, voos_gerados):
+                logger.info("✅ %s: %d voos gerados", companhia, voos_gerados)
         
-        with open(output_file, 'w', encoding='utf-8') as file:
-            numero_linha = 1
-            data_emissao = datetime.now().strftime('%d%b%y').upper()
-            
-            # HEADER
-            header = "1AIRLINE STANDARD SCHEDULE DATA SET"
-            linha_1 = header.ljust(192) + f"{numero_linha:08}"
-            file.write(linha_1 + "\n")
-            numero_linha += 1
-            
-            # 4 zeros após header
-            for _ in range(4):
-                file.write("0" * 200 + "\n")
-                numero_linha += 1
-            
-            # Carrier Info ÚNICA para TODAS as companhias
-            carrier_code = companias_list[0] if len(companias_list) == 1 else "XX"
-            linha_2 = f"2U{carrier_code}  0008    {data_emissao}{data_emissao}{data_emissao}Created by AMS Team Dnata Brasil    P"
-            linha_2 = linha_2.ljust(188) + "EN08" + f"{numero_linha:08}"
-            file.write(linha_2 + "\n")
-            numero_linha += 1
-            
-            # 4 zeros após carrier
-            for _ in range(4):
-                file.write("0" * 200 + "\n")
-                numero_linha += 1
-            
-            # PROCESSAR CADA COMPANHIA (SEM repetir 2U)
-            flight_counter = {}
-            
-            for companhia in companias_list:
-                print(f"\n🔄 Processando {companhia}...")
-                
-                df_cia = df[df.apply(lambda row: 
-                    extrair_airline(row.get('A.FLT', '')) == companhia or 
-                    extrair_airline(row.get('D.FLT', '')) == companhia, axis=1)].copy()
-                
-                if df_cia.empty:
-                    continue
-                
-                df_cia = df_cia.reset_index(drop=True)
-                
-                # PROCESSAR VOOS
-                voos_gerados = 0
-                
-                for idx, row in df_cia.iterrows():
-                    from_date, till_date = processar_periodo(row.get('FROM'), row.get('TILL'))
-                    arrive_type, depart_type = processar_flt_type(row.get('FLT.TYPE'))
-                    days_of_op = gerar_dias_operacionais_ssim(row)
-                    aircraft = processar_aircraft_type(row.get('ATY'))
-                    
-                    a_flt = row.get('A.FLT')
-                    d_flt = row.get('D.FLT')
-                    sta = converter_horario(row.get('STA'))
-                    std = converter_horario(row.get('STD'))
-                    orig = str(row.get('ORIG', 'XXX'))[:3].upper() if not pd.isna(row.get('ORIG')) else 'XXX'
-                    dest = str(row.get('DEST', 'XXX'))[:3].upper() if not pd.isna(row.get('DEST')) else 'XXX'
-                    
-                    # VOO DE CHEGADA (ORIG → AMS)
-                    if not pd.isna(a_flt) and a_flt != 'N/S' and orig != 'N/S':
-                        airline_a = extrair_airline(a_flt)
-                        if airline_a == companhia and sta:
-                            flight_num_a = extrair_numero_voo(a_flt)
-                            
-                            # NÃO calculamos STD de origem - usamos STA de AMS como referência
-                            # Horário de partida = STA menos 2h (genérico, pois não sabemos o real)
-                            try:
-                                sta_time = datetime.strptime(sta, '%H%M')
-                                std_origem = (sta_time - timedelta(hours=2)).strftime('%H%M')
-                            except:
-                                std_origem = "0600"
-                            
-                            key_a = f"{companhia}_{flight_num_a}_ARR"
-                            flight_counter[key_a] = flight_counter.get(key_a, 0) + 1
-                            itin_var = f"{flight_counter[key_a]:02d}"
-                            
-                            # Next Flight: D.FLT se válido, senão repetir próprio
-                            next_flight = None
-                            if not pd.isna(d_flt) and d_flt != 'N/S' and dest != 'N/S':
-                                airline_d = extrair_airline(d_flt)
-                                if airline_d == companhia:
-                                    flight_num_d = extrair_numero_voo(d_flt)
-                                    next_flight = (companhia, flight_num_d)
-                            elif dest == 'N/S' and not pd.isna(d_flt) and d_flt != 'N/S':
-                                airline_d = extrair_airline(d_flt)
-                                if airline_d == companhia:
-                                    flight_num_d = extrair_numero_voo(d_flt)
-                                    next_flight = (companhia, flight_num_d)
-                            
-                            if not next_flight:
-                                next_flight = (companhia, flight_num_a)
-                            
-                            # Construir linha: ORIG → AMS
-                            linha_ssim = construir_linha_ssim(
-                                companhia, flight_num_a, itin_var, "01", arrive_type,
-                                from_date, till_date, days_of_op,
-                                orig, std_origem, "+0000",  # Horário de origem é calculado (não temos real)
-                                "AMS", sta, "+0100",  # Horário de AMS é REAL da malha
-                                aircraft, next_flight, numero_linha
-                            )
-                            file.write(linha_ssim + "\n")
-                            numero_linha += 1
-                            voos_gerados += 1
-                    
-                    # VOO DE SAÍDA (AMS → DEST)
-                    if not pd.isna(d_flt) and d_flt != 'N/S' and dest != 'N/S':
-                        airline_d = extrair_airline(d_flt)
-                        if airline_d == companhia and std:
-                            flight_num_d = extrair_numero_voo(d_flt)
-                            
-                            # NÃO calculamos STA de destino - usamos STD de AMS como referência
-                            # Horário de chegada = STD mais 2h (genérico, pois não sabemos o real)
-                            try:
-                                std_time = datetime.strptime(std, '%H%M')
-                                sta_destino = (std_time + timedelta(hours=2)).strftime('%H%M')
-                            except:
-                                sta_destino = "1400"
-                            
-                            key_d = f"{companhia}_{flight_num_d}_DEP"
-                            flight_counter[key_d] = flight_counter.get(key_d, 0) + 1
-                            itin_var = f"{flight_counter[key_d]:02d}"
-                            
-                            # Departure repete própria informação
-                            next_flight = (companhia, flight_num_d)
-                            
-                            # Construir linha: AMS → DEST
-                            linha_ssim = construir_linha_ssim(
-                                companhia, flight_num_d, itin_var, "01", depart_type,
-                                from_date, till_date, days_of_op,
-                                "AMS", std, "+0100",  # Horário de AMS é REAL da malha
-                                dest, sta_destino, "+0000",  # Horário de destino é calculado (não temos real)
-                                aircraft, next_flight, numero_linha
-                            )
-                            file.write(linha_ssim + "\n")
-                            numero_linha += 1
-                            voos_gerados += 1
-                
-                print(f"✅ {companhia}: {voos_gerados} voos gerados")
-            
-            # FOOTER ÚNICO
-            for _ in range(4):
-                file.write("0" * 200 + "\n")
-                numero_linha += 1
-            
-            footer = f"5 {'MULTI' if len(companias_list) > 1 else companias_list[0]} {data_emissao}"
-            linha_5 = footer.ljust(187) + f"{numero_linha:06}E" + f"{numero_linha+1:06}"
-            file.write(linha_5 + "\n")
+            estado = EstadoIncremental(state_dir, nome_origem(excel_path)) if state_dir is not None else None
         
-        print(f"\n✅ Arquivo SSIM: {output_file}")
-        print(f"📊 Linhas: {numero_linha + 1}")
-        print("=" * 80)
+            def resumo_incremental():
+                if estado is not None:
+                    logger.info("♻️ Incremental: %d companhias reaproveitadas, %d geradas de novo",
+                                len(estado.reaproveitadas), len(estado.regeneradas))
         
-        return output_file
+            if split_by_carrier:
+                # Leitura e normalização únicas, um arquivo (header/footer próprios) por companhia
+                with medir(profiler, 'write'):
+                    gerados = _escrever_por_companhia(df_norm, particao, companias_list,
+                                                      '.' if output_file is None else output_file,
+                                                      on_carrier=ao_processar_companhia, workers=workers,
+                                                      estado=estado, profiler=profiler,
+                                                      progress_callback=progress_callback)
+                logger.info("✅ Arquivos SSIM: %s", gerados)
+                resumo_incremental()
+                return gerados
+        
+            if output_file is None:
+                output_file = nome_arquivo_saida(companias_list)
+        
+            # output_file pode ser caminho (.ssim / .ssim.gz) ou objeto arquivo (BytesIO, gzip, ...)
+            # Etapa 'write' sem o tempo de 'build' (gerado sob demanda dentro da escrita)
+            with medir(profiler, 'write'), SSIMWriter(output_file) as writer:
+                writer.write_records(_iter_registros(df_norm, particao, companias_list,
+                                                     on_carrier=ao_processar_companhia, workers=workers,
+                                                     estado=estado, profiler=profiler,
+                                                     progress_callback=progress_callback))
+            registros = writer.numero_linha - 1
+            _avisar_progresso(progress_callback, 'write', registros, registros)
+            if profiler is not None:
+                profiler.contar('registros', registros)
+        
+            logger.info("✅ Arquivo SSIM: %s (%d linhas)", output_file, writer.numero_linha)
+            resumo_incremental()
+        
+            return output_file
         
     except Exception as e:
-        print(f"❌ Erro: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Erro: %s", e)
         return None
 
 # Funções de compatibilidade
-def gerar_ssim_w25_single_airline(excel_path, codigo_iata, output_file=None):
-    return gerar_ssim_completo(excel_path, [codigo_iata], output_file)
+def gerar_ssim_w25_single_airline(excel_path, codigo_iata, output_file=None, cache_dir=None, profiler=None,
+                                  progress_callback=None):
+    return gerar_ssim_completo(excel_path, [codigo_iata], output_file, cache_dir, profiler=profiler,
+                               progress_callback=progress_callback)
 
-def gerar_ssim_w25_multiplas_companias(excel_path, companias_list, output_file=None):
-    return gerar_ssim_completo(excel_path, companias_list, output_file)
+def gerar_ssim_w25_multiplas_companias(excel_path, companias_list, output_file=None, cache_dir=None, workers=None,
+                                       split_by_carrier=False, state_dir=None, profiler=None, progress_callback=None):
+    return gerar_ssim_completo(excel_path, companias_list, output_file, cache_dir, workers, split_by_carrier,
+                               state_dir, profiler, progress_callback)
 
-def gerar_ssim_w25_todas_companias(excel_path, output_file=None):
-    return gerar_ssim_completo(excel_path, None, output_file)
+def gerar_ssim_w25_todas_companias(excel_path, output_file=None, cache_dir=None, workers=None,
+                                   split_by_carrier=False, state_dir=None, profiler=None, progress_callback=None):
+    return gerar_ssim_completo(excel_path, None, output_file, cache_dir, workers, split_by_carrier, state_dir,
+                               profiler, progress_callback)
 
 if __name__ == "__main__":
+    import sys
+    from ams_ssim import main
+
     print("Dutch Schedule to SSIM Converter - AMS Team")
-    print("Capacity Dnata Brasil - 2025")
\ No newline at end of file
+    print("Capacity Dnata Brasil - 2025")
+    sys.exit(main())
\ No newline at end of file